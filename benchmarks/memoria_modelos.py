@@ -0,0 +1,62 @@
+"""
+Compara la memoria de los comprobantes parseados con los modelos generados y con sus variantes con
+__slots__, usando los XML de tests/xml_prueba:
+
+    python -m benchmarks.memoria_modelos --copias 2000
+"""
+import argparse
+import gc
+import glob
+import os
+import tracemalloc
+from pathlib import Path
+from pycfdi import cfdv33, serialization
+from pycfdi.slots import cfdv33 as cfdv33_slots
+
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'xml_prueba')
+
+
+def medir(xmls: list, target_class: type) -> int:
+    """
+    Parsea todos los XML y mide la memoria que ocupan los comprobantes resultantes
+    :param xmls: Contenido de los XML
+    :param target_class: Clase del comprobante
+    :return: Bytes retenidos por los comprobantes
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        comprobantes = [serialization.deserialize(xml, target_class) for xml in xmls]
+        gc.collect()
+        retenidos, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del comprobantes
+
+    return retenidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copias', type=int, default=1000, help='Veces que se parsea cada XML de prueba')
+    args = parser.parse_args()
+
+    xmls = [Path(path).read_bytes() for path in sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml')))]
+    xmls *= args.copias
+
+    # Se parsea una vez cada modelo para que sus metadatos no cuenten en la medición
+    for target_class in (cfdv33.Comprobante, cfdv33_slots.Comprobante):
+        serialization.deserialize(xmls[0], target_class)
+
+    original = medir(xmls, cfdv33.Comprobante)
+    slots = medir(xmls, cfdv33_slots.Comprobante)
+
+    print(f'Comprobantes: {len(xmls)}')
+    print(f'dataclass:    {original / 2 ** 20:10.1f} MiB  {original / len(xmls):10.0f} B/comprobante')
+    print(f'__slots__:    {slots / 2 ** 20:10.1f} MiB  {slots / len(xmls):10.0f} B/comprobante')
+    print(f'Ahorro:       {1 - slots / original:10.1%}')
+
+
+if __name__ == '__main__':
+    main()
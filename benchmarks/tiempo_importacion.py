@@ -0,0 +1,62 @@
+"""
+Mide el tiempo de importación de pycfdi y de cada subpaquete con python -X importtime, en un proceso
+nuevo por medición para que nada quede en caché:
+
+    python -m benchmarks.tiempo_importacion --repeticiones 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULOS = (
+    'pycfdi',
+    'pycfdi.validation',
+    'pycfdi.validation.reglas',
+    'pycfdi.catalogos',
+    'pycfdi.cfdv33',
+    'pycfdi.serialization',
+    'pycfdi.crypto',
+    'pycfdi.parallel',
+)
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def medir(modulo: str) -> int:
+    """
+    Importa el módulo en un proceso nuevo
+    :param modulo:
+    :return: Tiempo acumulado de la importación en microsegundos
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    # Cada línea es "import time: self [us] | cumulative | imported package"
+    for linea in resultado.stderr.splitlines():
+        campos = [campo.strip() for campo in linea.split('|')]
+        if len(campos) == 3 and campos[2] == modulo and campos[1].isdigit():
+            return int(campos[1])
+
+    raise ValueError(f'{modulo} was not imported.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('modulos', nargs='*', default=MODULOS)
+    args = parser.parse_args()
+
+    for modulo in args.modulos:
+        tiempos = [medir(modulo) for _ in range(args.repeticiones)]
+        print(f'{modulo:<24} {statistics.median(tiempos) / 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
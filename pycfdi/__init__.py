@@ -1,7 +1,32 @@
 from ._version import __version__
 
-import pycfdi.cfdv33
-import pycfdi.complementos
-import pycfdi.crypto
-import pycfdi.serialization
-import pycfdi.validation
+import importlib
+
+# Los subpaquetes se importan al usarse por primera vez, para no pagar el costo de xsdata, lxml y
+# cryptography en los procesos que solo usan una parte de pycfdi
+_SUBMODULOS = (
+    'assets',
+    'cadenas',
+    'catalogos',
+    'cfdv33',
+    'complementos',
+    'crypto',
+    'exceptions',
+    'parallel',
+    'remote',
+    'serialization',
+    'slots',
+    'totales',
+    'validation',
+)
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULOS:
+        return importlib.import_module(f'{__name__}.{name}')
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULOS))
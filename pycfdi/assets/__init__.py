@@ -1,2 +1,3 @@
 import pycfdi.assets.stylesheets
 import pycfdi.assets.schemas
+from pycfdi.assets.registry import AssetRegistry, get_bytes, get_document, get_path
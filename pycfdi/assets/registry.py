@@ -0,0 +1,122 @@
+import atexit
+import importlib
+import importlib.resources
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+class AssetRegistry:
+    """
+    Resuelve una sola vez por proceso las hojas de estilos y esquemas incluidos en pycfdi.assets.
+
+    En una instalación normal las rutas apuntan a los archivos del paquete. Cuando el paquete se
+    importa desde un ZIP (zipapp, PEX) todos los archivos del paquete se extraen juntos a un directorio
+    temporal, para que los xsl:include relativos sigan funcionando, y se eliminan al terminar el proceso
+    """
+
+    def __init__(self):
+        self._directorios: Dict[str, Path] = {}
+        self._bytes: Dict[Tuple[str, str], bytes] = {}
+        self._documentos: Dict[Tuple[str, str], object] = {}
+        self._lock = threading.RLock()
+
+    def get_path(self, package: str, name: str) -> Path:
+        """
+        Ruta estable del archivo, válida durante toda la vida del proceso
+        :param package: Paquete que contiene el archivo, por ejemplo pycfdi.assets.stylesheets
+        :param name: Nombre del archivo
+        :return:
+        """
+        return self._get_directorio(package) / name
+
+    def get_bytes(self, package: str, name: str) -> bytes:
+        """
+        Contenido del archivo, leído la primera vez que se solicita
+        :param package:
+        :param name:
+        :return:
+        """
+        key = (package, name)
+        data = self._bytes.get(key)
+        if data is None:
+            data = self.get_path(package, name).read_bytes()
+            with self._lock:
+                data = self._bytes.setdefault(key, data)
+
+        return data
+
+    def get_document(self, package: str, name: str):
+        """
+        Documento parseado con lxml, compartido entre llamadas; no debe modificarse
+        :param package:
+        :param name:
+        :return: etree._ElementTree con la ruta del archivo como URL base
+        """
+        from lxml import etree
+
+        key = (package, name)
+        document = self._documentos.get(key)
+        if document is None:
+            document = etree.parse(str(self.get_path(package, name)))
+            with self._lock:
+                document = self._documentos.setdefault(key, document)
+
+        return document
+
+    def clear(self) -> None:
+        """
+        Olvida los archivos leídos y los documentos parseados; las rutas se conservan
+        """
+        with self._lock:
+            self._bytes.clear()
+            self._documentos.clear()
+
+    def _get_directorio(self, package: str) -> Path:
+        directorio = self._directorios.get(package)
+        if directorio is not None:
+            return directorio
+
+        with self._lock:
+            if package not in self._directorios:
+                module = importlib.import_module(package)
+                directorio = Path(os.path.dirname(os.path.abspath(module.__file__)))
+                if not directorio.is_dir():
+                    directorio = _extraer(package)
+                self._directorios[package] = directorio
+
+            return self._directorios[package]
+
+
+def _extraer(package: str) -> Path:
+    directorio = Path(tempfile.mkdtemp(prefix='pycfdi-'))
+    atexit.register(shutil.rmtree, str(directorio), True)
+
+    if hasattr(importlib.resources, 'files'):
+        for resource in importlib.resources.files(package).iterdir():
+            if resource.is_file():
+                (directorio / resource.name).write_bytes(resource.read_bytes())
+    else:
+        for name in importlib.resources.contents(package):
+            if importlib.resources.is_resource(package, name):
+                (directorio / name).write_bytes(importlib.resources.read_binary(package, name))
+
+    return directorio
+
+
+_default_registry = AssetRegistry()
+
+
+def get_path(package: str, name: str) -> Path:
+    return _default_registry.get_path(package, name)
+
+
+def get_bytes(package: str, name: str) -> bytes:
+    return _default_registry.get_bytes(package, name)
+
+
+def get_document(package: str, name: str):
+    return _default_registry.get_document(package, name)
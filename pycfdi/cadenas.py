@@ -0,0 +1,303 @@
+import functools
+import re
+from dataclasses import fields
+from typing import Iterator, List
+from xsdata.formats.converter import converter
+from pycfdi import cfdv33
+from pycfdi.complementos import pagos10, nomina12, timbre_fiscal_digitalv11
+from pycfdi.exceptions.cadenas import UnsupportedNodeError
+
+REQUERIDO = 'Requerido'
+OPCIONAL = 'Opcional'
+NODOS = 'Nodos'
+COMPLEMENTOS = 'Complementos'
+
+ESPACIOS_PATTERN = re.compile(r'[ \t\r\n]+')
+
+
+def _r(atributo: str) -> tuple:
+    return REQUERIDO, atributo
+
+
+def _o(atributo: str) -> tuple:
+    return OPCIONAL, atributo
+
+
+def _nodos(ruta: str) -> tuple:
+    return NODOS, tuple(ruta.split('/'))
+
+
+def _complementos(ruta: str) -> tuple:
+    return COMPLEMENTOS, tuple(ruta.split('/'))
+
+
+# Plantillas equivalentes a las de cadenaoriginal_3_3.xslt, Pagos10.xslt y nomina12.xslt,
+# indexadas por la clase del nodo y expresadas con los nombres XML de atributos y elementos
+PLANTILLAS = {
+    cfdv33.Comprobante: (
+        _r('Version'), _o('Serie'), _o('Folio'), _r('Fecha'), _o('FormaPago'), _r('NoCertificado'),
+        _o('CondicionesDePago'), _r('SubTotal'), _o('Descuento'), _r('Moneda'), _o('TipoCambio'), _r('Total'),
+        _r('TipoDeComprobante'), _o('MetodoPago'), _r('LugarExpedicion'), _o('Confirmacion'),
+        _nodos('CfdiRelacionados'), _nodos('Emisor'), _nodos('Receptor'), _nodos('Conceptos'),
+        _nodos('Impuestos'), _complementos('Complemento'),
+    ),
+    cfdv33.Comprobante.CfdiRelacionados: (
+        _r('TipoRelacion'), _nodos('CfdiRelacionado'),
+    ),
+    cfdv33.Comprobante.CfdiRelacionados.CfdiRelacionado: (
+        _r('UUID'),
+    ),
+    cfdv33.Comprobante.Emisor: (
+        _r('Rfc'), _o('Nombre'), _r('RegimenFiscal'),
+    ),
+    cfdv33.Comprobante.Receptor: (
+        _r('Rfc'), _o('Nombre'), _o('ResidenciaFiscal'), _o('NumRegIdTrib'), _r('UsoCFDI'),
+    ),
+    cfdv33.Comprobante.Conceptos: (
+        _nodos('Concepto'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto: (
+        _r('ClaveProdServ'), _o('NoIdentificacion'), _r('Cantidad'), _r('ClaveUnidad'), _o('Unidad'),
+        _r('Descripcion'), _r('ValorUnitario'), _r('Importe'), _o('Descuento'),
+        _nodos('Impuestos/Traslados/Traslado'), _nodos('Impuestos/Retenciones/Retencion'),
+        _nodos('InformacionAduanera'), _nodos('CuentaPredial'), _complementos('ComplementoConcepto'),
+        _nodos('Parte'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.Impuestos.Traslados.Traslado: (
+        _r('Base'), _r('Impuesto'), _r('TipoFactor'), _o('TasaOCuota'), _o('Importe'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.Impuestos.Retenciones.Retencion: (
+        _r('Base'), _r('Impuesto'), _r('TipoFactor'), _r('TasaOCuota'), _r('Importe'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.InformacionAduanera: (
+        _r('NumeroPedimento'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.CuentaPredial: (
+        _r('Numero'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.Parte: (
+        _r('ClaveProdServ'), _o('NoIdentificacion'), _r('Cantidad'), _o('Unidad'), _r('Descripcion'),
+        _o('ValorUnitario'), _o('Importe'), _nodos('InformacionAduanera'),
+    ),
+    cfdv33.Comprobante.Conceptos.Concepto.Parte.InformacionAduanera: (
+        _r('NumeroPedimento'),
+    ),
+    cfdv33.Comprobante.Impuestos: (
+        _nodos('Retenciones/Retencion'), _o('TotalImpuestosRetenidos'),
+        _nodos('Traslados/Traslado'), _o('TotalImpuestosTrasladados'),
+    ),
+    cfdv33.Comprobante.Impuestos.Retenciones.Retencion: (
+        _r('Impuesto'), _r('Importe'),
+    ),
+    cfdv33.Comprobante.Impuestos.Traslados.Traslado: (
+        _r('Impuesto'), _r('TipoFactor'), _r('TasaOCuota'), _r('Importe'),
+    ),
+    # El Timbre Fiscal Digital no forma parte de la cadena original del comprobante
+    timbre_fiscal_digitalv11.TimbreFiscalDigital: (),
+    pagos10.Pagos: (
+        _r('Version'), _nodos('Pago'),
+    ),
+    pagos10.Pagos.Pago: (
+        _r('FechaPago'), _r('FormaDePagoP'), _r('MonedaP'), _o('TipoCambioP'), _r('Monto'), _o('NumOperacion'),
+        _o('RfcEmisorCtaOrd'), _o('NomBancoOrdExt'), _o('CtaOrdenante'), _o('RfcEmisorCtaBen'),
+        _o('CtaBeneficiario'), _o('TipoCadPago'), _o('CertPago'), _o('CadPago'), _o('SelloPago'),
+        _nodos('DoctoRelacionado'), _nodos('Impuestos'),
+    ),
+    pagos10.Pagos.Pago.DoctoRelacionado: (
+        _r('IdDocumento'), _o('Serie'), _o('Folio'), _r('MonedaDR'), _o('TipoCambioDR'), _r('MetodoDePagoDR'),
+        _o('NumParcialidad'), _o('ImpSaldoAnt'), _o('ImpPagado'), _o('ImpSaldoInsoluto'),
+    ),
+    pagos10.Pagos.Pago.Impuestos: (
+        _o('TotalImpuestosRetenidos'), _o('TotalImpuestosTrasladados'),
+        _nodos('Retenciones/Retencion'), _nodos('Traslados/Traslado'),
+    ),
+    pagos10.Pagos.Pago.Impuestos.Retenciones.Retencion: (
+        _r('Impuesto'), _r('Importe'),
+    ),
+    pagos10.Pagos.Pago.Impuestos.Traslados.Traslado: (
+        _r('Impuesto'), _r('TipoFactor'), _r('TasaOCuota'), _r('Importe'),
+    ),
+    nomina12.Nomina: (
+        _r('Version'), _r('TipoNomina'), _r('FechaPago'), _r('FechaInicialPago'), _r('FechaFinalPago'),
+        _r('NumDiasPagados'), _o('TotalPercepciones'), _o('TotalDeducciones'), _o('TotalOtrosPagos'),
+        _nodos('Emisor'), _nodos('Receptor'), _nodos('Percepciones'), _nodos('Deducciones'),
+        _nodos('OtrosPagos'), _nodos('Incapacidades'),
+    ),
+    nomina12.Nomina.Emisor: (
+        _o('Curp'), _o('RegistroPatronal'), _o('RfcPatronOrigen'), _nodos('EntidadSNCF'),
+    ),
+    nomina12.Nomina.Emisor.EntidadSncf: (
+        _r('OrigenRecurso'), _o('MontoRecursoPropio'),
+    ),
+    nomina12.Nomina.Receptor: (
+        _r('Curp'), _o('NumSeguridadSocial'), _o('FechaInicioRelLaboral'), _o('Antigüedad'), _r('TipoContrato'),
+        _o('Sindicalizado'), _o('TipoJornada'), _r('TipoRegimen'), _r('NumEmpleado'), _o('Departamento'),
+        _o('Puesto'), _o('RiesgoPuesto'), _r('PeriodicidadPago'), _o('Banco'), _o('CuentaBancaria'),
+        _o('SalarioBaseCotApor'), _o('SalarioDiarioIntegrado'), _r('ClaveEntFed'), _nodos('SubContratacion'),
+    ),
+    nomina12.Nomina.Receptor.SubContratacion: (
+        _r('RfcLabora'), _r('PorcentajeTiempo'),
+    ),
+    nomina12.Nomina.Percepciones: (
+        _o('TotalSueldos'), _o('TotalSeparacionIndemnizacion'), _o('TotalJubilacionPensionRetiro'),
+        _r('TotalGravado'), _r('TotalExento'),
+        _nodos('Percepcion'), _nodos('JubilacionPensionRetiro'), _nodos('SeparacionIndemnizacion'),
+    ),
+    nomina12.Nomina.Percepciones.Percepcion: (
+        _r('TipoPercepcion'), _r('Clave'), _r('Concepto'), _r('ImporteGravado'), _r('ImporteExento'),
+        _nodos('AccionesOTitulos'), _nodos('HorasExtra'),
+    ),
+    nomina12.Nomina.Percepciones.Percepcion.AccionesOtitulos: (
+        _r('ValorMercado'), _r('PrecioAlOtorgarse'),
+    ),
+    nomina12.Nomina.Percepciones.Percepcion.HorasExtra: (
+        _r('Dias'), _r('TipoHoras'), _r('HorasExtra'), _r('ImportePagado'),
+    ),
+    nomina12.Nomina.Percepciones.JubilacionPensionRetiro: (
+        _o('TotalUnaExhibicion'), _o('TotalParcialidad'), _o('MontoDiario'),
+        _r('IngresoAcumulable'), _r('IngresoNoAcumulable'),
+    ),
+    nomina12.Nomina.Percepciones.SeparacionIndemnizacion: (
+        _r('TotalPagado'), _r('NumAñosServicio'), _r('UltimoSueldoMensOrd'),
+        _r('IngresoAcumulable'), _r('IngresoNoAcumulable'),
+    ),
+    nomina12.Nomina.Deducciones: (
+        _o('TotalOtrasDeducciones'), _o('TotalImpuestosRetenidos'), _nodos('Deduccion'),
+    ),
+    nomina12.Nomina.Deducciones.Deduccion: (
+        _r('TipoDeduccion'), _r('Clave'), _r('Concepto'), _r('Importe'),
+    ),
+    nomina12.Nomina.OtrosPagos: (
+        _nodos('OtroPago'),
+    ),
+    nomina12.Nomina.OtrosPagos.OtroPago: (
+        _r('TipoOtroPago'), _r('Clave'), _r('Concepto'), _r('Importe'),
+        _nodos('SubsidioAlEmpleo'), _nodos('CompensacionSaldosAFavor'),
+    ),
+    nomina12.Nomina.OtrosPagos.OtroPago.SubsidioAlEmpleo: (
+        _r('SubsidioCausado'),
+    ),
+    nomina12.Nomina.OtrosPagos.OtroPago.CompensacionSaldosAfavor: (
+        _r('SaldoAFavor'), _r('Año'), _r('RemanenteSalFav'),
+    ),
+    nomina12.Nomina.Incapacidades: (
+        _nodos('Incapacidad'),
+    ),
+    nomina12.Nomina.Incapacidades.Incapacidad: (
+        _r('DiasIncapacidad'), _r('TipoIncapacidad'), _o('ImporteMonetario'),
+    ),
+}
+
+# Plantillas raíz, equivalentes al template match="/" de cada hoja de estilos
+PLANTILLAS_RAIZ = {
+    cfdv33.Comprobante: PLANTILLAS[cfdv33.Comprobante],
+    timbre_fiscal_digitalv11.TimbreFiscalDigital: (
+        _r('Version'), _r('UUID'), _r('FechaTimbrado'), _r('RfcProvCertif'), _o('Leyenda'),
+        _r('SelloCFD'), _r('NoCertificadoSAT'),
+    ),
+}
+
+
+def generar(obj: object) -> str:
+    """
+    Genera la cadena original recorriendo directamente el dataclass,
+    con las mismas reglas de orden y espacios que las hojas de estilos del SAT
+    :param obj: Comprobante o TimbreFiscalDigital
+    :return:
+    """
+    plantilla = _plantillas_raiz_compiladas.get(type(obj))
+    if plantilla is None:
+        raise UnsupportedNodeError(f'No native template for {type(obj).__name__}.')
+
+    partes = ['|']
+    _aplicar(obj, plantilla, partes)
+    partes.append('||')
+
+    return ''.join(partes)
+
+
+def registrar_variante(original: type, variante: type) -> None:
+    """
+    Usa las plantillas de una clase para otra con los mismos campos, como las variantes con __slots__
+    :param original: Clase con plantilla
+    :param variante:
+    """
+    if original in _plantillas_compiladas:
+        _plantillas_compiladas[variante] = _plantillas_compiladas[original]
+    if original in _plantillas_raiz_compiladas:
+        _plantillas_raiz_compiladas[variante] = _plantillas_raiz_compiladas[original]
+
+
+def _aplicar(obj: object, plantilla: tuple, partes: List[str]) -> None:
+    for tipo, campo in plantilla:
+        if tipo == REQUERIDO:
+            partes.append('|' + _maneja_espacios(getattr(obj, campo)))
+        elif tipo == OPCIONAL:
+            valor = getattr(obj, campo)
+            if valor is not None:
+                partes.append('|' + _maneja_espacios(valor))
+        elif tipo == NODOS:
+            for nodo in _seleccionar(obj, campo):
+                _aplicar(nodo, _get_plantilla(nodo), partes)
+        elif tipo == COMPLEMENTOS:
+            for contenedor in _seleccionar(obj, campo):
+                for complemento in getattr(contenedor, 'any_element', None) or []:
+                    _aplicar(complemento, _get_plantilla(complemento), partes)
+
+
+def _seleccionar(obj: object, ruta: tuple) -> Iterator[object]:
+    valor = getattr(obj, ruta[0], None)
+
+    if valor is None:
+        return
+
+    for nodo in valor if isinstance(valor, list) else (valor,):
+        if len(ruta) == 1:
+            yield nodo
+        else:
+            siguiente = (_get_nombres_campos(type(nodo))[ruta[1]],) + ruta[2:]
+            yield from _seleccionar(nodo, siguiente)
+
+
+def _get_plantilla(obj: object) -> tuple:
+    plantilla = _plantillas_compiladas.get(type(obj))
+    if plantilla is None:
+        raise UnsupportedNodeError(f'No native template for {type(obj).__name__}.')
+
+    return plantilla
+
+
+def _compilar(cls: type, plantilla: tuple) -> tuple:
+    """
+    Traduce los nombres XML de la plantilla a nombres de campo del dataclass
+    """
+    nombres = _get_nombres_campos(cls)
+    compilada = []
+
+    for tipo, nombre in plantilla:
+        if tipo in (REQUERIDO, OPCIONAL):
+            nombre = nombres[nombre]
+        else:
+            nombre = (nombres[nombre[0]],) + nombre[1:]
+        compilada.append((tipo, nombre))
+
+    return tuple(compilada)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_nombres_campos(cls: type) -> dict:
+    return {f.metadata.get('name', f.name): f.name for f in fields(cls)}
+
+
+def _maneja_espacios(valor: object) -> str:
+    if valor is None:
+        return ''
+
+    if not isinstance(valor, str):
+        valor = converter.serialize(valor)
+
+    return ESPACIOS_PATTERN.sub(' ', valor).strip(' ')
+
+
+_plantillas_compiladas = {cls: _compilar(cls, plantilla) for cls, plantilla in PLANTILLAS.items()}
+_plantillas_raiz_compiladas = {cls: _compilar(cls, plantilla) for cls, plantilla in PLANTILLAS_RAIZ.items()}
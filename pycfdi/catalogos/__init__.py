@@ -0,0 +1,32 @@
+"""
+Catálogos del SAT.
+
+Los catálogos pequeños se incluyen en el paquete. Los extensos (clave_prod_serv, clave_unidad,
+codigo_postal, estado y pais) no se incluyen: exporta cada hoja del catálogo del SAT a un CSV con
+encabezados nombrado como el catálogo (c_ClaveProdServ.csv, ...) y compílalos en el directorio de
+la variable de entorno PYCFDI_CATALOGOS_PATH:
+
+    catalogos.compilar_directorio('/ruta/csv', '/ruta/catalogos')
+
+Hasta entonces, consultar esos catálogos lanza CatalogNotFoundError.
+"""
+from pycfdi.catalogos.catalogo import Catalogo, CATALOGOS_PATH_ENV, compilar, compilar_csv, \
+    compilar_directorio
+
+# Catálogos incluidos en pycfdi.assets.catalogos, compilados con tools/compilar_catalogos.py
+forma_pago = Catalogo('c_FormaPago')
+impuesto = Catalogo('c_Impuesto')
+metodo_pago = Catalogo('c_MetodoPago')
+moneda = Catalogo('c_Moneda')
+regimen_fiscal = Catalogo('c_RegimenFiscal')
+tipo_de_comprobante = Catalogo('c_TipoDeComprobante')
+tipo_factor = Catalogo('c_TipoFactor')
+tipo_relacion = Catalogo('c_TipoRelacion')
+uso_cfdi = Catalogo('c_UsoCFDI')
+
+# Catálogos extensos que se compilan desde los CSV del SAT en el directorio de CATALOGOS_PATH_ENV
+clave_prod_serv = Catalogo('c_ClaveProdServ')
+clave_unidad = Catalogo('c_ClaveUnidad')
+codigo_postal = Catalogo('c_CodigoPostal')
+estado = Catalogo('c_Estado')
+pais = Catalogo('c_Pais')
@@ -0,0 +1,246 @@
+import collections
+import csv
+import glob
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+import zlib
+import pycfdi.assets.catalogos
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+from pycfdi import exceptions
+
+CATALOGOS_PATH_ENV = 'PYCFDI_CATALOGOS_PATH'
+EXTENSION = '.cat'
+
+# Formato de archivo (little endian):
+#   encabezado | columnas | tabla hash de nslots offsets | registros
+# Cada registro es su longitud seguida de sus campos en utf-8 separados por SEPARADOR;
+# el primer campo es la clave. Un offset 0 marca una posición vacía de la tabla.
+MAGIC = b'PCAT'
+VERSION = 1
+SEPARADOR = b'\x1f'
+_ENCABEZADO = struct.Struct('<4sHII')
+_ENTERO = struct.Struct('<I')
+
+
+class Catalogo:
+    """
+    Catálogo del SAT de solo lectura, abierto con mmap la primera vez que se consulta.
+
+    La búsqueda por clave usa una tabla hash guardada en el propio archivo, por lo que
+    no se carga nada en memoria y las páginas del archivo se comparten entre procesos.
+    """
+
+    def __init__(self, nombre: str, path: Union[str, Path, None] = None):
+        self.nombre = nombre
+        self._path = path
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    @property
+    def columnas(self) -> tuple:
+        self._abrir()
+        return self._registro._fields
+
+    def get(self, clave: str, default=None):
+        """
+        Busca el registro de la clave
+        :param clave:
+        :param default: Valor devuelto si la clave no existe
+        :return: namedtuple con las columnas del catálogo
+        """
+        offset = self._buscar(clave)
+        if offset is None:
+            return default
+
+        return self._leer_registro(offset)
+
+    def __getitem__(self, clave: str):
+        offset = self._buscar(clave)
+        if offset is None:
+            raise KeyError(clave)
+
+        return self._leer_registro(offset)
+
+    def __contains__(self, clave: str) -> bool:
+        return self._buscar(clave) is not None
+
+    def __len__(self) -> int:
+        self._abrir()
+        return self._nregistros
+
+    def __iter__(self) -> Iterator:
+        mm = self._abrir()
+        offset = self._registros_offset
+        for _ in range(self._nregistros):
+            yield self._leer_registro(offset)
+            offset += _ENTERO.size + _ENTERO.unpack_from(mm, offset)[0]
+
+    def __reduce__(self):
+        # Cada proceso vuelve a abrir el archivo; el sistema operativo comparte sus páginas
+        return self.__class__, (self.nombre, self._path)
+
+    def _buscar(self, clave: str) -> Optional[int]:
+        mm = self._abrir()
+        if not self._nslots or not isinstance(clave, str):
+            return None
+
+        clave_bytes = clave.encode('utf-8')
+        longitud_clave = len(clave_bytes)
+        slot = zlib.crc32(clave_bytes) % self._nslots
+
+        while True:
+            offset = _ENTERO.unpack_from(mm, self._slots_offset + slot * _ENTERO.size)[0]
+            if not offset:
+                return None
+
+            longitud = _ENTERO.unpack_from(mm, offset)[0]
+            inicio = offset + _ENTERO.size
+            if mm[inicio:inicio + longitud_clave] == clave_bytes and (
+                    longitud == longitud_clave or mm[inicio + longitud_clave] == SEPARADOR[0]):
+                return offset
+
+            slot = (slot + 1) % self._nslots
+
+    def _leer_registro(self, offset: int):
+        longitud = _ENTERO.unpack_from(self._mmap, offset)[0]
+        inicio = offset + _ENTERO.size
+        campos = self._mmap[inicio:inicio + longitud].decode('utf-8').split(SEPARADOR.decode())
+
+        return self._registro(*campos)
+
+    def _abrir(self) -> mmap.mmap:
+        if self._mmap is not None:
+            return self._mmap
+
+        with self._lock:
+            if self._mmap is None:
+                path = self._path or _get_path(self.nombre)
+                with open(path, 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+                magic, version, self._nslots, self._nregistros = _ENCABEZADO.unpack_from(mm, 0)
+                if magic != MAGIC or version != VERSION:
+                    mm.close()
+                    raise exceptions.catalogos.InvalidCatalogError(f'{path} is not a valid catalog file.')
+
+                longitud = _ENTERO.unpack_from(mm, _ENCABEZADO.size)[0]
+                inicio = _ENCABEZADO.size + _ENTERO.size
+                columnas = mm[inicio:inicio + longitud].decode('utf-8').split(SEPARADOR.decode())
+
+                self._registro = collections.namedtuple('Registro', columnas, rename=True)
+                self._slots_offset = inicio + longitud
+                self._registros_offset = self._slots_offset + self._nslots * _ENTERO.size
+                self._mmap = mm
+
+        return self._mmap
+
+
+def compilar(filas: Iterable[Sequence[str]], columnas: Sequence[str], destino: Union[str, Path]) -> int:
+    """
+    Genera el archivo binario de un catálogo
+    :param filas: Registros del catálogo; la primera columna es la clave
+    :param columnas: Nombres de las columnas
+    :param destino: Ruta del archivo .cat
+    :return: Número de registros escritos
+    """
+    columnas_bytes = SEPARADOR.join(columna.encode('utf-8') for columna in columnas)
+    registros = []
+    claves = []
+    for fila in filas:
+        if len(fila) != len(columnas):
+            raise ValueError(f'Row {fila!r} does not have {len(columnas)} columns.')
+
+        registro = SEPARADOR.join(str(campo).encode('utf-8') for campo in fila)
+        registros.append(_ENTERO.pack(len(registro)) + registro)
+        claves.append(registro.split(SEPARADOR, 1)[0])
+
+    nslots = len(registros) * 2
+    slots_offset = _ENCABEZADO.size + _ENTERO.size + len(columnas_bytes)
+    slots = [0] * nslots
+    offset = slots_offset + nslots * _ENTERO.size
+
+    for clave, registro in zip(claves, registros):
+        slot = zlib.crc32(clave) % nslots
+        while slots[slot]:
+            slot = (slot + 1) % nslots
+        slots[slot] = offset
+        offset += len(registro)
+
+    with open(destino, 'wb') as f:
+        f.write(_ENCABEZADO.pack(MAGIC, VERSION, nslots, len(registros)))
+        f.write(_ENTERO.pack(len(columnas_bytes)) + columnas_bytes)
+        f.write(struct.pack(f'<{nslots}I', *slots))
+        f.writelines(registros)
+
+    return len(registros)
+
+
+def compilar_csv(origen: Union[str, Path], destino: Union[str, Path], encoding: str = 'utf-8') -> int:
+    """
+    Genera el archivo binario de un catálogo a partir de un CSV con encabezados,
+    como los publicados por el SAT. Los encabezados se convierten en nombres de columna
+    :param origen: Ruta del CSV
+    :param destino: Ruta del archivo .cat
+    :param encoding:
+    :return: Número de registros escritos
+    """
+    with open(origen, newline='', encoding=encoding) as f:
+        reader = csv.reader(f)
+        columnas = [_get_nombre_columna(encabezado) for encabezado in next(reader)]
+
+        return compilar((fila for fila in reader if any(fila)), columnas, destino)
+
+
+def compilar_directorio(origen: Union[str, Path], destino: Union[str, Path, None] = None,
+                        encoding: str = 'utf-8') -> List[str]:
+    """
+    Compila cada CSV de un directorio en un archivo .cat con el mismo nombre, p. ej. las hojas
+    del catálogo del SAT exportadas como c_ClaveProdServ.csv, c_ClaveUnidad.csv y c_CodigoPostal.csv
+    :param origen: Directorio de los CSV
+    :param destino: Directorio de los archivos .cat; por omisión el de CATALOGOS_PATH_ENV
+    :param encoding:
+    :return: Nombres de los catálogos compilados
+    """
+    destino = destino or os.environ.get(CATALOGOS_PATH_ENV)
+    if not destino:
+        raise ValueError(f'No destination directory was given and {CATALOGOS_PATH_ENV} is not set.')
+
+    os.makedirs(destino, exist_ok=True)
+    nombres = []
+    for path in sorted(glob.glob(os.path.join(glob.escape(os.fspath(origen)), '*.csv'))):
+        nombre = os.path.splitext(os.path.basename(path))[0]
+        compilar_csv(path, os.path.join(destino, nombre + EXTENSION), encoding)
+        nombres.append(nombre)
+
+    return nombres
+
+
+def _get_path(nombre: str) -> str:
+    archivo = nombre + EXTENSION
+    if os.environ.get(CATALOGOS_PATH_ENV):
+        path = os.path.join(os.environ[CATALOGOS_PATH_ENV], archivo)
+        if os.path.isfile(path):
+            return path
+
+    # El registro extrae los assets a un directorio real cuando pycfdi se importa desde un zip,
+    # ya que mmap necesita un archivo en disco
+    path = pycfdi.assets.get_path(pycfdi.assets.catalogos.__name__, archivo)
+    if path.is_file():
+        return os.fspath(path)
+
+    raise exceptions.catalogos.CatalogNotFoundError(
+        f'Catalog {nombre} was not found. Compile the SAT CSV with catalogos.compilar_directorio into '
+        f'the directory set in {CATALOGOS_PATH_ENV}.'
+    )
+
+
+def _get_nombre_columna(encabezado: str) -> str:
+    nombre = unicodedata.normalize('NFKD', encabezado).encode('ascii', 'ignore').decode()
+    nombre = re.sub(r'\W+', '_', nombre.strip().lower()).strip('_')
+
+    return nombre or 'columna'
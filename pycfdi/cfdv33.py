@@ -1,9 +1,7 @@
 from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import List, Optional
-import pycfdi.assets.stylesheets
-import pycfdi.assets.schemas
-import importlib.resources
+import pycfdi.assets
 
 __NAMESPACE__ = "http://www.sat.gob.mx/cfd/3"
 
@@ -117,13 +115,11 @@ class Comprobante:
 
         @staticmethod
         def stylesheet():
-            with importlib.resources.path(pycfdi.assets.stylesheets.__name__, 'cadenaoriginal_3_3.xslt') as path:
-                return path
+            return pycfdi.assets.get_path(pycfdi.assets.stylesheets.__name__, 'cadenaoriginal_3_3.xslt')
 
         @staticmethod
         def schema():
-            with importlib.resources.path(pycfdi.assets.schemas.__name__, 'cfdv33.xsd') as path:
-                return path
+            return pycfdi.assets.get_path(pycfdi.assets.schemas.__name__, 'cfdv33.xsd')
 
     def get_complemento_by_type(self, complemento_type: type):
         complementos = self.complemento[0] if isinstance(self.complemento, list) else self.complemento
@@ -1,7 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Optional
-import importlib.resources
-import pycfdi.assets.stylesheets
+import pycfdi.assets
 
 __NAMESPACE__ = "http://www.sat.gob.mx/TimbreFiscalDigital"
 
@@ -46,8 +45,7 @@ class TimbreFiscalDigital:
 
         @staticmethod
         def stylesheet():
-            with importlib.resources.path(pycfdi.assets.stylesheets.__name__, 'cadenaoriginal_TFD_1_1.xslt') as path:
-                return path
+            return pycfdi.assets.get_path(pycfdi.assets.stylesheets.__name__, 'cadenaoriginal_TFD_1_1.xslt')
 
     version: str = field(
         init=False,
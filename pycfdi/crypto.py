@@ -1,15 +1,32 @@
 import base64
+import binascii
+import functools
 import hashlib
+import hmac
+import os
 import pycfdi
+import threading
+import time
 from lxml import etree
-from typing import Union
-from pycfdi import exceptions
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pycfdi import cfdv33, exceptions
 from cryptography import x509
+from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding, utils
 from cryptography.hazmat.primitives import serialization
 from dataclasses import is_dataclass
 
+CREDENTIAL_CACHE_MAXSIZE = 1024
+CREDENTIAL_CACHE_TTL = 3600
+# Folios por solicitud de cancelación aceptados por el servicio del SAT
+CANCELACION_MAX_FOLIOS = 500
+
+CredentialCacheInfo = namedtuple('CredentialCacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
 
 def leer_certificado(cer_bytes: bytes) -> x509.Certificate:
     return x509.load_der_x509_certificate(cer_bytes)
@@ -24,23 +41,91 @@ def leer_llave_privada(key_bytes: bytes, password: str) -> rsa.RSAPrivateKey:
         raise e
 
 
-def xmldsig(data, cer: x509.Certificate, private_key: rsa.RSAPrivateKey) -> bytes:
-    import os.path
-
+def xmldsig(
+        data,
+        cer: x509.Certificate,
+        private_key: rsa.RSAPrivateKey,
+        as_element: bool = False) -> Union[bytes, etree._Element]:
+    """
+    Firma un documento con XMLDSig. Acepta un dataclass, un elemento de lxml, una ruta o el
+    contenido del XML; cuando el tipo se conoce de antemano conviene usar xmldsig_from_element,
+    xmldsig_from_bytes o xmldsig_from_path
+    :param data:
+    :param cer:
+    :param private_key:
+    :param as_element: Devolver el elemento firmado en lugar de los bytes del documento
+    :return:
+    """
     if is_dataclass(data):
-        data = pycfdi.serialization.serialize(data).encode('utf-8')
-
-    if os.path.isfile(data):
-        data = etree.parse(data)
-    else:
-        data = etree.fromstring(data)
-
+        tree = pycfdi.serialization.serialize_tree(data)
+        return xmldsig_from_element(tree, cer, private_key, as_element=as_element, in_place=True)
+    if isinstance(data, (etree._Element, etree._ElementTree)):
+        return xmldsig_from_element(data, cer, private_key, as_element=as_element)
+    if isinstance(data, Path):
+        return xmldsig_from_path(data, cer, private_key, as_element=as_element)
+    if not pycfdi.serialization.is_xml_content(data) and os.path.isfile(data):
+        return xmldsig_from_path(data, cer, private_key, as_element=as_element)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    return xmldsig_from_bytes(data, cer, private_key, as_element=as_element)
+
+
+def xmldsig_from_element(
+        element: Union[etree._Element, etree._ElementTree],
+        cer: x509.Certificate,
+        private_key: rsa.RSAPrivateKey,
+        as_element: bool = False,
+        in_place: bool = False) -> Union[bytes, etree._Element]:
+    """
+    Firma con XMLDSig un documento ya parseado
+    :param element: Elemento raíz o árbol de lxml
+    :param cer:
+    :param private_key:
+    :param as_element: Devolver el elemento firmado en lugar de los bytes del documento
+    :param in_place: Agregar la firma al mismo elemento en lugar de a una copia
+    :return:
+    """
     signer = XMLDSigSigner()
-    element = signer.sign(data, key=private_key, cer=cer)
+    element = signer.sign(element, key=private_key, cer=cer, in_place=in_place)
+    if as_element:
+        return element
 
     return etree.tostring(element, xml_declaration=True, encoding='utf-8')
 
 
+def xmldsig_from_bytes(
+        data: bytes,
+        cer: x509.Certificate,
+        private_key: rsa.RSAPrivateKey,
+        as_element: bool = False) -> Union[bytes, etree._Element]:
+    """
+    Firma con XMLDSig el contenido de un documento
+    :param data: XML serializado
+    :param cer:
+    :param private_key:
+    :param as_element: Devolver el elemento firmado en lugar de los bytes del documento
+    :return:
+    """
+    return xmldsig_from_element(etree.fromstring(data), cer, private_key, as_element=as_element, in_place=True)
+
+
+def xmldsig_from_path(
+        path: Union[str, Path],
+        cer: x509.Certificate,
+        private_key: rsa.RSAPrivateKey,
+        as_element: bool = False) -> Union[bytes, etree._Element]:
+    """
+    Firma con XMLDSig un documento en disco
+    :param path: Ruta del XML
+    :param cer:
+    :param private_key:
+    :param as_element: Devolver el elemento firmado en lugar de los bytes del documento
+    :return:
+    """
+    return xmldsig_from_element(etree.parse(os.fsdecode(path)), cer, private_key, as_element=as_element, in_place=True)
+
+
 def sellar(
         message: Union[bytes, str],
         private_key: rsa.RSAPrivateKey,
@@ -60,6 +145,212 @@ def sellar(
     return base64.b64encode(signed).decode('utf-8')
 
 
+def sellar_lote(
+        messages: Iterable[Union[bytes, str]],
+        private_key: rsa.RSAPrivateKey,
+        hash_algo: hashes.HashAlgorithm = hashes.SHA256(),
+        max_workers: Optional[int] = None) -> List[str]:
+    """
+    Sella un lote de cadenas originales reutilizando el padding y el algoritmo de hash.
+    Con max_workers las firmas RSA se reparten en un pool de hilos, ya que OpenSSL libera el GIL
+    :param messages: Cadenas originales
+    :param private_key:
+    :param hash_algo:
+    :param max_workers: Número de hilos; None sella secuencialmente
+    :return: Sellos en el mismo orden que los mensajes
+    """
+    hashlib_algo = getattr(hashlib, hash_algo.name)
+    pkcs1v15 = padding.PKCS1v15()
+    prehashed = utils.Prehashed(hash_algo)
+
+    def _sellar(message: Union[bytes, str]) -> str:
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+
+        signed = private_key.sign(hashlib_algo(message).digest(), pkcs1v15, prehashed)
+
+        return base64.b64encode(signed).decode('utf-8')
+
+    if not max_workers:
+        return [_sellar(message) for message in messages]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_sellar, messages))
+
+
+def verificar(
+        message: Union[bytes, str],
+        sello: str,
+        public_key: rsa.RSAPublicKey,
+        hash_algo: hashes.HashAlgorithm = hashes.SHA256()) -> bool:
+    if isinstance(message, str):
+        message = message.encode('utf-8')
+
+    hashlib_algo = getattr(hashlib, hash_algo.name)
+    digest = hashlib_algo(message).digest()
+
+    try:
+        public_key.verify(
+            base64.b64decode(sello),
+            digest,
+            padding.PKCS1v15(),
+            utils.Prehashed(hash_algo)
+        )
+    except (InvalidSignature, binascii.Error):
+        return False
+
+    return True
+
+
+def verificar_sello(comprobante, hash_algo: hashes.HashAlgorithm = hashes.SHA256()) -> bool:
+    """
+    Verifica el sello del comprobante contra su cadena original y el
+    certificado incluido en el atributo Certificado
+    :param comprobante: cfdv33.Comprobante
+    :param hash_algo:
+    :return: False si el sello no corresponde, el certificado no puede leerse o su número de serie no
+        es el NoCertificado del comprobante
+    """
+    if not comprobante.sello or not comprobante.certificado:
+        return False
+
+    try:
+        cer = leer_certificado_base64(comprobante.certificado, comprobante.no_certificado)
+    except ValueError:
+        return False
+
+    if no_certificado(cer) != comprobante.no_certificado:
+        return False
+
+    cadena_original = pycfdi.serialization.cadena_original(comprobante)
+
+    return verificar(cadena_original, comprobante.sello, cer.public_key(), hash_algo)
+
+
+def verificar_sellos(source, max_workers: Optional[int] = None) -> Iterator[Tuple[object, bool]]:
+    """
+    Verifica los sellos de un lote de comprobantes conforme se van leyendo
+    :param source: Iterable de comprobantes o cualquier origen aceptado por serialization.iter_deserialize
+    :param max_workers: Número de procesos; None verifica en el proceso actual
+    :return: Tuplas (comprobante, sello válido) en el orden de lectura
+    """
+    import zipfile
+
+    if isinstance(source, (str, bytes, os.PathLike, zipfile.ZipFile)) or hasattr(source, 'read'):
+        source = pycfdi.serialization.iter_documents(source)
+
+    if max_workers:
+        from pycfdi import parallel
+        with parallel.Pool(max_workers=max_workers) as pool:
+            yield from pool.verificar_sello(source)
+        return
+
+    for comprobante in source:
+        if not is_dataclass(comprobante):
+            comprobante = pycfdi.serialization.deserialize(comprobante)
+
+        yield comprobante, verificar_sello(comprobante)
+
+
+def verificar_sello_sat(
+        timbre,
+        store: 'CertificateStore',
+        hash_algo: hashes.HashAlgorithm = hashes.SHA256()) -> bool:
+    """
+    Verifica el SelloSAT del Timbre Fiscal Digital contra la cadena original del timbre
+    y el certificado del SAT/PAC registrado en el almacén con su NoCertificadoSAT
+    :param timbre: timbre_fiscal_digitalv11.TimbreFiscalDigital o el cfdv33.Comprobante timbrado
+    :param store: Almacén de certificados del SAT
+    :param hash_algo:
+    :return: False si el sello no corresponde o el comprobante no está timbrado
+    :raises CertificateNotFoundError: Si el almacén no tiene el certificado del timbre
+    """
+    from pycfdi.complementos import timbre_fiscal_digitalv11
+
+    if not isinstance(timbre, timbre_fiscal_digitalv11.TimbreFiscalDigital):
+        timbre = timbre.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+
+    if timbre is None or not timbre.sello_sat or not timbre.no_certificado_sat:
+        return False
+
+    cer = store.get(timbre.no_certificado_sat)
+    cadena_original = pycfdi.serialization.cadena_original(timbre)
+
+    return verificar(cadena_original, timbre.sello_sat, cer.public_key(), hash_algo)
+
+
+def firmar_cancelaciones(
+        uuids: Iterable[str],
+        rfc_emisor: str,
+        cer: x509.Certificate,
+        private_key: rsa.RSAPrivateKey,
+        fecha: Optional[str] = None,
+        folios_por_solicitud: int = CANCELACION_MAX_FOLIOS,
+        max_workers: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Divide los UUID en solicitudes de cancelación del tamaño permitido por el SAT y las firma con XMLDSig.
+    Cada solicitud se construye con cfdv33.Cancelacion, se serializa directamente como árbol de lxml
+    y se firma en el lugar
+    :param uuids: Folios fiscales a cancelar del emisor
+    :param rfc_emisor:
+    :param cer: Certificado del emisor
+    :param private_key: Llave privada del emisor
+    :param fecha: Fecha de las solicitudes; por omisión la fecha y hora actual
+    :param folios_por_solicitud: Máximo de UUID por solicitud
+    :param max_workers: Número de hilos para firmar; None firma secuencialmente
+    :return: Solicitudes firmadas en el orden de los UUID
+    """
+    import datetime
+    import itertools
+
+    fecha = fecha or datetime.datetime.now().replace(microsecond=0).isoformat()
+    signer = XMLDSigSigner(cer, private_key)
+    iterator = iter(uuids)
+    chunks = iter(lambda: list(itertools.islice(iterator, folios_por_solicitud)), [])
+
+    def _firmar(chunk: List[str]) -> bytes:
+        element = signer.sign(_create_cancelacion_element(rfc_emisor, fecha, chunk), in_place=True)
+        return etree.tostring(element, xml_declaration=True, encoding='utf-8')
+
+    if not max_workers:
+        yield from map(_firmar, chunks)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Solicitudes en vuelo; limita la memoria cuando hay muchos UUID
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_firmar, chunk))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def _create_cancelacion_element(rfc_emisor: str, fecha: str, uuids: List[str]) -> etree.Element:
+    folios = cfdv33.Cancelacion.Folios
+    cancelacion = cfdv33.Cancelacion(
+        rfc_emisor=rfc_emisor,
+        fecha=fecha,
+        folios=[folios(uuid=folios.UUID(value=uuid)) for uuid in uuids],
+    )
+
+    return pycfdi.serialization.serialize_tree(cancelacion).getroot()
+
+
+@functools.lru_cache(maxsize=1024)
+def leer_certificado_base64(cer_base64: str, no_certificado: Optional[str] = None) -> x509.Certificate:
+    """
+    Lee un certificado en base64, conservando en cache los ya leídos para
+    que el certificado de un mismo emisor se decodifique una sola vez
+    :param cer_base64:
+    :param no_certificado: Número de certificado, forma parte de la llave del cache
+    :return:
+    """
+    return leer_certificado(base64.b64decode(cer_base64))
+
+
 def certificado_base64(cer: x509.Certificate) -> str:
     encoding = serialization.Encoding.DER
     cer_bytes = cer.public_bytes(encoding)
@@ -107,11 +398,273 @@ def __get_subject_value_for_oid(cer: x509.Certificate, oid: x509.ObjectIdentifie
     return attributes[0].value.split('/')[0].strip()
 
 
-class XMLDSigSigner:
+class CredentialCache:
+    """
+    Cache LRU con expiración de certificados y llaves privadas ya leídos, seguro para uso entre hilos.
+
+    Cada entrada se identifica por el sha256 del archivo y, en las llaves privadas, por un HMAC
+    de la contraseña con un secreto aleatorio de la instancia; la contraseña nunca se conserva.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = CREDENTIAL_CACHE_MAXSIZE,
+            ttl: Optional[float] = CREDENTIAL_CACHE_TTL,
+            timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._timer = timer
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def leer_certificado(self, cer_bytes: bytes) -> x509.Certificate:
+        key = ('cer', hashlib.sha256(cer_bytes).digest())
+
+        return self._get_or_load(key, lambda: leer_certificado(cer_bytes))
+
+    def leer_llave_privada(self, key_bytes: bytes, password: str) -> rsa.RSAPrivateKey:
+        password_hash = hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest()
+        key = ('key', hashlib.sha256(key_bytes).digest(), password_hash)
+
+        return self._get_or_load(key, lambda: leer_llave_privada(key_bytes, password))
+
+    def invalidar(self, data: bytes) -> int:
+        """
+        Elimina las entradas del certificado o llave indicados, sin importar la contraseña
+        :param data: Bytes del .cer o .key
+        :return: Número de entradas eliminadas
+        """
+        digest = hashlib.sha256(data).digest()
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == digest]
+            for key in keys:
+                del self._entries[key]
+
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> CredentialCacheInfo:
+        return CredentialCacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_or_load(self, key: tuple, load: Callable):
+        now = self._timer()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or now < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+                self.evictions += 1
+
+            self.misses += 1
+
+        value = load()
+        expires = now + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+
+class Sellador:
+    """
+    Sella comprobantes con el certificado y la llave de un emisor.
+
+    El certificado en base64, su número y la llave privada se leen una sola vez al crear el sellador;
+    con un CredentialCache, los selladores de un mismo emisor comparten el certificado y la llave ya leídos.
+    """
+
+    def __init__(
+            self,
+            cer_bytes: bytes,
+            key_bytes: bytes,
+            password: str,
+            hash_algo: hashes.HashAlgorithm = hashes.SHA256(),
+            cache: Optional[CredentialCache] = None):
+        if cache is not None:
+            self.cer = cache.leer_certificado(cer_bytes)
+            self.private_key = cache.leer_llave_privada(key_bytes, password)
+        else:
+            self.cer = leer_certificado(cer_bytes)
+            self.private_key = leer_llave_privada(key_bytes, password)
+        if not is_pareja(self.cer, self.private_key):
+            raise ValueError('The certificate and the private key do not match.')
+
+        self.certificado = certificado_base64(self.cer)
+        self.no_certificado = no_certificado(self.cer)
+        self.hash_algo = hash_algo
+
+    def sellar_comprobante(self, comprobante, pretty_print: bool = False) -> bytes:
+        """
+        Asigna Certificado, NoCertificado y Sello al comprobante y lo serializa una sola vez.
+        Si la cadena original no puede generarse sin XSLT, se transforma el mismo árbol
+        que se devuelve, asignándole después el sello
+        :param comprobante: cfdv33.Comprobante; se modifica en el lugar
+        :param pretty_print:
+        :return: XML sellado
+        """
+        comprobante.certificado = self.certificado
+        comprobante.no_certificado = self.no_certificado
+
+        try:
+            cadena_original = pycfdi.cadenas.generar(comprobante)
+        except exceptions.cadenas.UnsupportedNodeError:
+            comprobante.sello = ''
+            if pretty_print:
+                # Los espacios de la indentación forman parte del documento que se transforma
+                root = etree.fromstring(pycfdi.serialization.serialize(comprobante, pretty_print=True).encode('utf-8'))
+            else:
+                root = pycfdi.serialization.serialize_tree(comprobante).getroot()
+            xslt = pycfdi.serialization.get_xslt_transform(comprobante.Meta.stylesheet)
+
+            comprobante.sello = sellar(str(xslt(root)), self.private_key, self.hash_algo)
+            root.set('Sello', comprobante.sello)
+
+            return etree.tostring(root, xml_declaration=True, encoding='UTF-8')
+
+        comprobante.sello = sellar(cadena_original, self.private_key, self.hash_algo)
+
+        return pycfdi.serialization.serialize(comprobante, pretty_print=pretty_print).encode('utf-8')
+
+
+class CertificateStore:
+    """
+    Almacén local de certificados indexado por número de certificado.
+
+    Solo guarda los bytes DER de cada certificado, por lo que puede enviarse a otros
+    procesos; cada instancia lee un certificado la primera vez que se solicita.
+    """
+
+    def __init__(self, certificados: Optional[Dict[str, bytes]] = None):
+        self._certificados = dict(certificados or {})
+        self._leidos = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, path: Union[str, Path]) -> 'CertificateStore':
+        """
+        Crea el almacén a partir de los archivos .cer de un directorio y sus subdirectorios
+        :param path:
+        :return:
+        """
+        store = cls()
+        for cer_path in sorted(Path(path).rglob('*.cer')):
+            store.add(cer_path.read_bytes())
+
+        return store
 
-    def sign(self, data: etree.Element, key: rsa.RSAPrivateKey, cer: x509.Certificate):
+    def add(self, cer_bytes: bytes) -> str:
+        """
+        Agrega un certificado en formato DER o PEM
+        :param cer_bytes:
+        :return: Número del certificado agregado
+        """
+        if cer_bytes.lstrip().startswith(b'-----BEGIN'):
+            cer = x509.load_pem_x509_certificate(cer_bytes)
+            cer_bytes = cer.public_bytes(serialization.Encoding.DER)
+        else:
+            cer = leer_certificado(cer_bytes)
+
+        numero = no_certificado(cer)
+        with self._lock:
+            self._certificados[numero] = cer_bytes
+            self._leidos[numero] = cer
+
+        return numero
+
+    def get(self, numero: str) -> x509.Certificate:
+        cer = self._leidos.get(numero)
+        if cer is not None:
+            return cer
+
+        try:
+            cer_bytes = self._certificados[numero]
+        except KeyError:
+            raise exceptions.crypto.CertificateNotFoundError(numero) from None
+
+        with self._lock:
+            cer = self._leidos.get(numero)
+            if cer is None:
+                cer = self._leidos[numero] = leer_certificado(cer_bytes)
+
+        return cer
+
+    def __contains__(self, numero: str) -> bool:
+        return numero in self._certificados
+
+    def __len__(self) -> int:
+        return len(self._certificados)
+
+    def __getstate__(self) -> dict:
+        return {'_certificados': self._certificados}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['_certificados'])
+
+
+class XMLDSigSigner:
+    """
+    Firma XMLDSig enveloped con RSA-SHA1.
+
+    Puede ligarse a un certificado y llave para reutilizarse: el KeyInfo se genera una sola vez
+    y el SignedInfo se copia de un esqueleto ya parseado en lugar de parsear una plantilla en cada firma.
+    """
+
+    def __init__(self, cer: Optional[x509.Certificate] = None, key: Optional[rsa.RSAPrivateKey] = None):
+        self.cer = cer
+        self.key = key
+        self._key_info = self._create_key_info_element(cer) if cer is not None else None
+
+    def sign(
+            self,
+            data: etree.Element,
+            key: Optional[rsa.RSAPrivateKey] = None,
+            cer: Optional[x509.Certificate] = None,
+            in_place: bool = False):
+        """
+        Agrega el nodo Signature al documento
+        :param data: Elemento raíz a firmar
+        :param key: Llave privada; por omisión la del firmante
+        :param cer: Certificado; por omisión el del firmante
+        :param in_place: Firmar el mismo elemento en lugar de una copia
+        :return: Elemento firmado
+        """
         import copy
-        data = copy.deepcopy(data)
+
+        if isinstance(data, etree._ElementTree):
+            data = data.getroot()
+        if not in_place:
+            data = copy.deepcopy(data)
+
+        key = key or self.key
+        cer = cer or self.cer
+        if key is None or cer is None:
+            raise ValueError('A certificate and a private key are required to sign.')
+
+        if cer is self.cer:
+            key_info = copy.deepcopy(self._key_info)
+        else:
+            key_info = self._create_key_info_element(cer)
 
         digest_source = etree.tostring(data, method='c14n')
         digest_value = base64.b64encode(hashlib.sha1(digest_source).digest())
@@ -129,48 +682,44 @@ class XMLDSigSigner:
         )
 
         etree.SubElement(signature, 'SignatureValue').text = signed_info_value
-
-        key_info = self._create_key_info_element(cer)
         signature.append(key_info)
 
         return data
 
     @staticmethod
     def _create_signed_info_element(digest_value: bytes):
-        template = f"""
-        <SignedInfo>
-            <CanonicalizationMethod Algorithm="http://www.w3.org/TR/2001/REC-xml-c14n-20010315"/>
-            <SignatureMethod Algorithm="http://www.w3.org/2000/09/xmldsig#rsa-sha1"/>
-            <Reference URI="">
-                <Transforms>
-                  <Transform Algorithm="http://www.w3.org/2000/09/xmldsig#enveloped-signature"/>
-                </Transforms>
-                <DigestMethod Algorithm="http://www.w3.org/2000/09/xmldsig#sha1"/>
-                <DigestValue>{digest_value.decode()}</DigestValue>
-            </Reference>
-        </SignedInfo>
-        """
+        import copy
 
-        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True)
-        element = etree.fromstring(template, parser=parser)
+        element = copy.deepcopy(_SIGNED_INFO_SKELETON)
+        element.find('Reference/DigestValue').text = digest_value.decode()
 
         return element
 
     @staticmethod
     def _create_key_info_element(cer: x509.Certificate):
-        template = f"""
-        <KeyInfo>
-            <X509Data>
-                <X509IssuerSerial>
-                    <X509IssuerName>{cer.issuer.rfc4514_string()}</X509IssuerName>
-                    <X509SerialNumber>{no_certificado(cer)}</X509SerialNumber>
-                </X509IssuerSerial>
-                <X509Certificate>{certificado_base64(cer)}</X509Certificate>
-            </X509Data>
-        </KeyInfo>
-        """
-
-        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True)
-        element = etree.fromstring(template, parser=parser)
+        element = etree.Element('KeyInfo')
+        x509_data = etree.SubElement(element, 'X509Data')
+        issuer_serial = etree.SubElement(x509_data, 'X509IssuerSerial')
+        etree.SubElement(issuer_serial, 'X509IssuerName').text = cer.issuer.rfc4514_string()
+        etree.SubElement(issuer_serial, 'X509SerialNumber').text = no_certificado(cer)
+        etree.SubElement(x509_data, 'X509Certificate').text = certificado_base64(cer)
 
         return element
+
+
+_SIGNED_INFO_SKELETON = etree.fromstring(
+    """
+    <SignedInfo>
+        <CanonicalizationMethod Algorithm="http://www.w3.org/TR/2001/REC-xml-c14n-20010315"/>
+        <SignatureMethod Algorithm="http://www.w3.org/2000/09/xmldsig#rsa-sha1"/>
+        <Reference URI="">
+            <Transforms>
+              <Transform Algorithm="http://www.w3.org/2000/09/xmldsig#enveloped-signature"/>
+            </Transforms>
+            <DigestMethod Algorithm="http://www.w3.org/2000/09/xmldsig#sha1"/>
+            <DigestValue></DigestValue>
+        </Reference>
+    </SignedInfo>
+    """,
+    parser=etree.XMLParser(remove_blank_text=True, remove_comments=True)
+)
@@ -1 +1,4 @@
 import pycfdi.exceptions.crypto
+import pycfdi.exceptions.cadenas
+import pycfdi.exceptions.catalogos
+import pycfdi.exceptions.remote
@@ -0,0 +1,6 @@
+class CatalogNotFoundError(FileNotFoundError):
+    pass
+
+
+class InvalidCatalogError(ValueError):
+    pass
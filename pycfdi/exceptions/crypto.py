@@ -1,2 +1,6 @@
 class IncorrectPasswordError(Exception):
     pass
+
+
+class CertificateNotFoundError(KeyError):
+    pass
@@ -0,0 +1,2 @@
+class RemoteResourceUnavailableError(OSError):
+    pass
@@ -0,0 +1,168 @@
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import is_dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Union
+from pycfdi import cfdv33, crypto, serialization
+from pycfdi.complementos import timbre_fiscal_digitalv11
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Estado de cada proceso worker, inicializado una sola vez por _init_worker
+_worker = {}
+
+
+class Pool:
+    """
+    Reparte deserialize, cadena_original y sellar entre varios procesos.
+
+    Cada worker se inicializa una sola vez (XmlContext, XSLT compiladas y llave privada)
+    y los elementos se envían en bloques de ``chunksize`` para amortizar el IPC.
+    Los resultados se devuelven en el mismo orden que las entradas.
+    """
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            chunksize: int = DEFAULT_CHUNK_SIZE,
+            key_bytes: Optional[bytes] = None,
+            password: Optional[str] = None,
+            certificate_store: Optional[crypto.CertificateStore] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        # Bloques en vuelo; limita la memoria cuando la entrada es muy grande
+        self.max_pending = self.max_workers * 2
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(key_bytes, password, certificate_store)
+        )
+
+    def deserialize(
+            self,
+            resources: Iterable[Union[str, Path, bytes]],
+            target_class: Optional[Type[T]] = None) -> Iterator[T]:
+        return self._map(_deserialize, ((resource, target_class) for resource in resources))
+
+    def cadena_original(self, objs: Iterable[Union[object, str, bytes, Path]]) -> Iterator[str]:
+        """
+        Genera la cadena original de cada comprobante; las rutas y el contenido XML se deserializan
+        antes en el worker
+        :param objs:
+        :return: Cadenas originales en el orden de las entradas
+        """
+        return self._map(_cadena_original, objs)
+
+    def sellar(self, messages: Iterable[Union[bytes, str]]) -> Iterator[str]:
+        return self._map(_sellar, messages)
+
+    def verificar_sello(self, comprobantes: Iterable[Union[object, str, Path, bytes]]) -> Iterator[Tuple[object, bool]]:
+        return self._map(_verificar_sello, comprobantes)
+
+    def verificar_sello_sat(self, comprobantes: Iterable[Union[object, str, Path, bytes]]) -> Iterator[Tuple[object, bool]]:
+        return self._map(_verificar_sello_sat, comprobantes)
+
+    def procesar(
+            self,
+            resources: Iterable[Union[str, Path, bytes]]) -> Iterator[Tuple[cfdv33.Comprobante, str, Optional[str]]]:
+        """
+        Deserializa cada CFDI, genera su cadena original y, si el pool tiene llave, la sella,
+        todo dentro del mismo worker
+        :param resources:
+        :return: Tuplas (comprobante, cadena original, sello)
+        """
+        return self._map(_procesar, resources)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> 'Pool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _map(self, fn: Callable, items: Iterable) -> Iterator:
+        pending = collections.deque()
+        iterator = iter(items)
+
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunksize))
+            if not chunk:
+                break
+
+            pending.append(self._executor.submit(_run_chunk, fn, chunk))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _init_worker(
+        key_bytes: Optional[bytes],
+        password: Optional[str],
+        certificate_store: Optional[crypto.CertificateStore]) -> None:
+    _worker['codec'] = serialization.Codec()
+    _worker['private_key'] = crypto.leer_llave_privada(key_bytes, password) if key_bytes else None
+    _worker['certificate_store'] = certificate_store
+
+    serialization.get_xslt_transform(cfdv33.Comprobante.Meta.stylesheet)
+    serialization.get_xslt_transform(timbre_fiscal_digitalv11.TimbreFiscalDigital.Meta.stylesheet)
+
+
+def _run_chunk(fn: Callable, chunk: List) -> List:
+    return [fn(item) for item in chunk]
+
+
+def _deserialize(args: tuple) -> object:
+    resource, target_class = args
+
+    return _worker['codec'].deserialize(resource, target_class)
+
+
+def _cadena_original(obj: Union[object, str, bytes, Path]) -> str:
+    codec = _worker['codec']
+    if not is_dataclass(obj):
+        obj = codec.deserialize(obj)
+
+    return codec.cadena_original(obj)
+
+
+def _sellar(message: Union[bytes, str]) -> str:
+    private_key = _worker['private_key']
+    if private_key is None:
+        raise ValueError('The pool was created without a private key.')
+
+    return crypto.sellar(message, private_key)
+
+
+def _verificar_sello(comprobante: Union[object, str, Path, bytes]) -> Tuple[object, bool]:
+    if not is_dataclass(comprobante):
+        comprobante = _worker['codec'].deserialize(comprobante)
+
+    return comprobante, crypto.verificar_sello(comprobante)
+
+
+def _verificar_sello_sat(comprobante: Union[object, str, Path, bytes]) -> Tuple[object, bool]:
+    certificate_store = _worker['certificate_store']
+    if certificate_store is None:
+        raise ValueError('The pool was created without a certificate store.')
+
+    if not is_dataclass(comprobante):
+        comprobante = _worker['codec'].deserialize(comprobante)
+
+    return comprobante, crypto.verificar_sello_sat(comprobante, certificate_store)
+
+
+def _procesar(resource: Union[str, Path, bytes]) -> Tuple[cfdv33.Comprobante, str, Optional[str]]:
+    codec = _worker['codec']
+    comprobante = codec.deserialize(resource)
+    cadena = codec.cadena_original(comprobante)
+    sello = crypto.sellar(cadena, _worker['private_key']) if _worker['private_key'] else None
+
+    return comprobante, cadena, sello
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from lxml import etree
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import pycfdi.assets
+from pycfdi import exceptions
+
+CACHE_PATH_ENV = 'PYCFDI_CACHE_PATH'
+OFFLINE_ENV = 'PYCFDI_OFFLINE'
+# Segundos durante los que una descarga se usa sin volver a validarla con el servidor
+CACHE_MAX_AGE = 24 * 60 * 60
+FETCH_TIMEOUT = 30
+
+_STYLESHEETS = pycfdi.assets.stylesheets.__name__
+
+# URLs del SAT que se resuelven con un archivo incluido en pycfdi.assets: (paquete, nombre). Solo
+# aparecen los archivos incluidos sin cambios; cadenaoriginal_3_3.xslt (con includes relativos) y los
+# esquemas (reducidos o sin xs:import) son distintos a los publicados y se obtienen con el cache
+SAT_ASSETS = {
+    'http://www.sat.gob.mx/sitio_internet/cfd/TimbreFiscalDigital/cadenaoriginal_TFD_1_1.xslt':
+        (_STYLESHEETS, 'cadenaoriginal_TFD_1_1.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/2/cadenaoriginal_2_0/utilerias.xslt':
+        (_STYLESHEETS, 'utilerias.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/EstadoDeCuentaCombustible/ecc11.xslt':
+        (_STYLESHEETS, 'ecc11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/donat/donat11.xslt':
+        (_STYLESHEETS, 'donat11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/divisas/divisas.xslt':
+        (_STYLESHEETS, 'divisas.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/implocal/implocal.xslt':
+        (_STYLESHEETS, 'implocal.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/leyendasFiscales/leyendasFisc.xslt':
+        (_STYLESHEETS, 'leyendasFisc.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/pfic/pfic.xslt':
+        (_STYLESHEETS, 'pfic.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/TuristaPasajeroExtranjero/TuristaPasajeroExtranjero.xslt':
+        (_STYLESHEETS, 'TuristaPasajeroExtranjero.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/nomina/nomina12.xslt':
+        (_STYLESHEETS, 'nomina12.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/cfdiregistrofiscal/cfdiregistrofiscal.xslt':
+        (_STYLESHEETS, 'cfdiregistrofiscal.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/pagoenespecie/pagoenespecie.xslt':
+        (_STYLESHEETS, 'pagoenespecie.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/aerolineas/aerolineas.xslt':
+        (_STYLESHEETS, 'aerolineas.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/valesdedespensa/valesdedespensa.xslt':
+        (_STYLESHEETS, 'valesdedespensa.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/consumodecombustibles/consumodecombustibles.xslt':
+        (_STYLESHEETS, 'consumodecombustibles.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/notariospublicos/notariospublicos.xslt':
+        (_STYLESHEETS, 'notariospublicos.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/vehiculousado/vehiculousado.xslt':
+        (_STYLESHEETS, 'vehiculousado.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/servicioparcialconstruccion/servicioparcialconstruccion.xslt':
+        (_STYLESHEETS, 'servicioparcialconstruccion.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/renovacionysustitucionvehiculos/renovacionysustitucionvehiculos.xslt':
+        (_STYLESHEETS, 'renovacionysustitucionvehiculos.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/certificadodestruccion/certificadodedestruccion.xslt':
+        (_STYLESHEETS, 'certificadodedestruccion.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/arteantiguedades/obrasarteantiguedades.xslt':
+        (_STYLESHEETS, 'obrasarteantiguedades.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/ComercioExterior11/ComercioExterior11.xslt':
+        (_STYLESHEETS, 'ComercioExterior11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/ine/ine11.xslt':
+        (_STYLESHEETS, 'ine11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/iedu/iedu.xslt':
+        (_STYLESHEETS, 'iedu.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/ventavehiculos/ventavehiculos11.xslt':
+        (_STYLESHEETS, 'ventavehiculos11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/terceros/terceros11.xslt':
+        (_STYLESHEETS, 'terceros11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/Pagos/Pagos10.xslt':
+        (_STYLESHEETS, 'Pagos10.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/detallista/detallista.xslt':
+        (_STYLESHEETS, 'detallista.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/EstadoDeCuentaCombustible/ecc12.xslt':
+        (_STYLESHEETS, 'ecc12.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/consumodecombustibles/consumodeCombustibles11.xslt':
+        (_STYLESHEETS, 'consumodeCombustibles11.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/GastosHidrocarburos10/GastosHidrocarburos10.xslt':
+        (_STYLESHEETS, 'GastosHidrocarburos10.xslt'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/IngresosHidrocarburos10/IngresosHidrocarburos.xslt':
+        (_STYLESHEETS, 'IngresosHidrocarburos.xslt'),
+}
+
+
+class RemoteCache:
+    """
+    Cache en disco de hojas de estilos y esquemas remotos, direccionado por el contenido.
+
+    Cada URL guarda en index/ su ETag, su Last-Modified y el SHA-256 del contenido, que se guarda
+    en objects/. Pasado max_age la descarga se revalida con el servidor; si el servidor no responde se
+    usa la copia guardada. En modo offline nunca se usa la red. Las URLs del SAT de SAT_ASSETS se
+    resuelven con el archivo incluido en pycfdi.assets
+    """
+
+    def __init__(
+            self,
+            directory: Union[str, Path, None] = None,
+            offline: bool = False,
+            max_age: float = CACHE_MAX_AGE,
+            timeout: float = FETCH_TIMEOUT,
+            bundled: bool = True):
+        self.directory = Path(directory) if directory else _get_default_directory()
+        self.offline = offline
+        self.max_age = max_age
+        self.timeout = timeout
+        self.bundled = bundled
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> bytes:
+        """
+        Obtiene el contenido de la URL, descargándolo solo si no está en el cache o ya caducó
+        :param url:
+        :return:
+        """
+        if self.bundled:
+            asset = get_asset(url)
+            if asset is not None:
+                return pycfdi.assets.get_bytes(*asset)
+
+        entrada = self._get_entrada(url)
+        if entrada is not None and (self.offline or time.time() - entrada['fecha'] < self.max_age):
+            return entrada['contenido']
+
+        if self.offline:
+            raise exceptions.remote.RemoteResourceUnavailableError(
+                f'{url} is not cached and offline mode is enabled.'
+            )
+
+        return self._descargar(url, entrada)
+
+    def invalidar(self, url: str) -> bool:
+        """
+        Elimina la URL del cache para forzar una descarga nueva
+        :param url:
+        :return: True si la URL se encontraba en el cache
+        """
+        with self._lock:
+            encontrada = self._entradas.pop(url, None) is not None
+
+        try:
+            self._get_index_path(url).unlink()
+        except FileNotFoundError:
+            return encontrada
+
+        return True
+
+    def _descargar(self, url: str, entrada: Optional[dict]) -> bytes:
+        request = urllib.request.Request(url)
+        if entrada is not None and entrada.get('etag'):
+            request.add_header('If-None-Match', entrada['etag'])
+        if entrada is not None and entrada.get('last_modified'):
+            request.add_header('If-Modified-Since', entrada['last_modified'])
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                contenido = response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entrada is not None:
+                self._guardar(url, entrada['contenido'], entrada.get('etag'), entrada.get('last_modified'))
+                return entrada['contenido']
+            error = e
+        except (urllib.error.URLError, OSError) as e:
+            error = e
+        else:
+            self._guardar(url, contenido, etag, last_modified)
+            return contenido
+
+        # Sin conexión se prefiere una copia caducada a fallar
+        if entrada is not None:
+            return entrada['contenido']
+
+        raise exceptions.remote.RemoteResourceUnavailableError(f'{url} could not be fetched: {error}') from error
+
+    def _get_entrada(self, url: str) -> Optional[dict]:
+        entrada = self._entradas.get(url)
+        if entrada is not None:
+            return entrada
+
+        try:
+            entrada = json.loads(self._get_index_path(url).read_text(encoding='utf-8'))
+            contenido = self._get_object_path(entrada['sha256']).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Un objeto que no corresponde a su hash se trata como ausente
+        if hashlib.sha256(contenido).hexdigest() != entrada['sha256']:
+            return None
+
+        entrada['contenido'] = contenido
+        with self._lock:
+            return self._entradas.setdefault(url, entrada)
+
+    def _guardar(self, url: str, contenido: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        sha256 = hashlib.sha256(contenido).hexdigest()
+        entrada = {
+            'url': url,
+            'sha256': sha256,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fecha': time.time(),
+        }
+
+        # Si el directorio no admite escritura el contenido se conserva solo en memoria
+        try:
+            object_path = self._get_object_path(sha256)
+            if not object_path.is_file():
+                _escribir(object_path, contenido)
+            _escribir(self._get_index_path(url), json.dumps(entrada).encode('utf-8'))
+        except OSError:
+            pass
+
+        entrada['contenido'] = contenido
+        with self._lock:
+            self._entradas[url] = entrada
+
+    def _get_index_path(self, url: str) -> Path:
+        return self.directory / 'index' / (hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _get_object_path(self, sha256: str) -> Path:
+        return self.directory / 'objects' / sha256
+
+
+class SatResolver(etree.Resolver):
+    """
+    Resuelve los documentos http(s) que lxml solicita, incluidos los xsl:include y xs:import,
+    a través de un RemoteCache
+    """
+
+    def __init__(self, cache: Optional[RemoteCache] = None):
+        super().__init__()
+        self.cache = cache
+
+    def resolve(self, url, pubid, context):
+        if not url or urllib.parse.urlsplit(url).scheme not in ('http', 'https'):
+            return None
+
+        cache = self.cache or get_default_cache()
+
+        return self.resolve_string(cache.fetch(url), context, base_url=url)
+
+
+def fetch(url: str) -> bytes:
+    return get_default_cache().fetch(url)
+
+
+def parse(source: Union[str, Path], cache: Optional[RemoteCache] = None) -> etree._ElementTree:
+    """
+    Parsea un documento local o remoto resolviendo sus referencias http(s) con el cache
+    :param source: URL o ruta
+    :param cache: Por omisión el cache del proceso
+    :return:
+    """
+    parser = get_parser(cache)
+    if isinstance(source, str) and urllib.parse.urlsplit(source).scheme in ('http', 'https'):
+        contenido = (cache or get_default_cache()).fetch(source)
+        return etree.fromstring(contenido, parser, base_url=source).getroottree()
+
+    return etree.parse(str(source), parser)
+
+
+def get_parser(cache: Optional[RemoteCache] = None) -> etree.XMLParser:
+    """
+    Crea un parser de lxml que resuelve las referencias http(s) con el cache. Los parsers de lxml
+    no deben compartirse entre hilos
+    :param cache: Por omisión el cache del proceso
+    :return:
+    """
+    parser = etree.XMLParser()
+    parser.resolvers.add(SatResolver(cache))
+
+    return parser
+
+
+def get_asset(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Archivo incluido en pycfdi.assets idéntico al publicado por el SAT en la URL
+    :param url:
+    :return: (paquete, nombre) o None si la URL no corresponde a un archivo incluido
+    """
+    return SAT_ASSETS.get(url)
+
+
+def get_default_cache() -> RemoteCache:
+    global _default_cache
+
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                offline = os.environ.get(OFFLINE_ENV, '').lower() in ('1', 'true', 'yes')
+                _default_cache = RemoteCache(offline=offline)
+
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[RemoteCache]) -> None:
+    """
+    Reemplaza el cache del proceso; con None se vuelve a crear a partir de las variables de entorno
+    :param cache:
+    """
+    global _default_cache
+
+    with _default_cache_lock:
+        _default_cache = cache
+
+
+def _get_default_directory() -> Path:
+    if os.environ.get(CACHE_PATH_ENV):
+        return Path(os.environ[CACHE_PATH_ENV])
+
+    return Path(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'pycfdi')
+
+
+def _escribir(path: Path, contenido: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, str(path))
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+_default_cache: Optional[RemoteCache] = None
+_default_cache_lock = threading.Lock()
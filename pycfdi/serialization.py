@@ -1,14 +1,28 @@
-from dataclasses import is_dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field, is_dataclass
 from lxml import etree
+from lxml.sax import ElementTreeContentHandler
 from pathlib import Path
-from typing import Union, Optional, Type, TypeVar, Callable
+from typing import Union, Optional, Type, TypeVar, Callable, Iterable, Iterator, BinaryIO
 from xsdata.formats.dataclass.context import XmlContext
 from xsdata.formats.dataclass.serializers import XmlSerializer
 from xsdata.formats.dataclass.serializers.config import SerializerConfig
+from xsdata.formats.dataclass.serializers.mixins import XmlWriter
+from xsdata.formats.dataclass.models.generics import AnyElement, DerivedElement
 from xsdata.formats.dataclass.parsers import XmlParser
+from xsdata.formats.dataclass.parsers.nodes import ElementNode
 from xsdata.utils import namespaces
+import functools
+import hashlib
+import io
 import os.path
+import re
+import threading
+import urllib.parse
+import zipfile
+from pycfdi import cadenas, cfdv33, remote
 from pycfdi.complementos import (pagos10, timbre_fiscal_digitalv11, nomina12)
+from pycfdi.exceptions.cadenas import UnsupportedNodeError
 
 T = TypeVar("T")
 
@@ -18,60 +32,405 @@ COMPLEMENTO_TYPES_MAP = {
     'http://www.sat.gob.mx/nomina12': nomina12.Nomina
 }
 
+COMPLEMENTO_PARENT_TYPES = (cfdv33.Comprobante.Complemento,)
+
+# Complementos que el parser enlaza según la clase del nodo padre
+_complemento_types = {parent_type: COMPLEMENTO_TYPES_MAP for parent_type in COMPLEMENTO_PARENT_TYPES}
+
+XSLT_CACHE_MAXSIZE = 16
+
+XSL_NAMESPACE = 'http://www.w3.org/1999/XSL/Transform'
+# Prefijos de los nombres calificados en un patrón match, sin confundirlos con ejes como child::
+XSLT_MATCH_PREFIX_PATTERN = re.compile(r'(?<![\w.:-])([A-Za-z_][\w.-]*):(?![:])')
+
+# <?xml seguido de un espacio, para no confundir la declaración con instrucciones como <?xml-stylesheet?>
+XML_DECLARATION_PATTERN = re.compile(rb'<\?xml\s')
+XML_DOCUMENT_PADDING = b' \t\r\n\xef\xbb\xbf'
+STREAM_CHUNK_SIZE = 1 << 20
+
 
 def serialize(obj: object, pretty_print: bool = False) -> str:
-    ns_map = __get_ns_map(obj)
-    schema_location = __get_ns_schema_location(obj)
-    config = SerializerConfig(
-        xml_version='1.0',
-        encoding='UTF-8',
-        schema_location=schema_location,
-        pretty_print=pretty_print
-    )
-    serializer = XmlSerializer(config=config)
+    return _default_codec.serialize(obj, pretty_print=pretty_print)
+
 
-    return serializer.render(obj, ns_map=ns_map)
+def serialize_tree(obj: object) -> etree._ElementTree:
+    return _default_codec.serialize_tree(obj)
 
 
 def deserialize(resource: Union[str, Path, bytes], target_class: Optional[Type[T]] = None) -> Optional[T]:
-    parser = XmlParser(context=XmlContext())
-    obj = None
+    return _default_codec.deserialize(resource, target_class)
 
-    if os.path.isfile(resource):
-        resource = Path(resource)
 
-    if isinstance(resource, str):
-        obj = parser.from_string(resource, target_class)
-    if isinstance(resource, Path):
-        obj = parser.from_path(resource, target_class)
-    if isinstance(resource, bytes):
-        obj = parser.from_bytes(resource, target_class)
+def deserialize_bytes(data: bytes, target_class: Optional[Type[T]] = None) -> Optional[T]:
+    return _default_codec.deserialize_bytes(data, target_class)
 
-    if obj and hasattr(obj, 'complemento') and obj.complemento:
-        complementos = __deserialize_complementos(obj)
-        setattr(obj.complemento, 'any_element', complementos)
 
-    return obj
+def deserialize_string(data: str, target_class: Optional[Type[T]] = None) -> Optional[T]:
+    return _default_codec.deserialize_string(data, target_class)
+
+
+def deserialize_path(path: Union[str, Path], target_class: Optional[Type[T]] = None) -> Optional[T]:
+    return _default_codec.deserialize_path(path, target_class)
+
+
+def registrar_complementos(parent_type: Type, types_map: dict) -> None:
+    """
+    Registra los dataclasses con los que el parser enlaza los complementos de un nodo
+    :param parent_type: Clase del nodo Complemento
+    :param types_map: Clase de cada complemento por namespace
+    """
+    _complemento_types[parent_type] = types_map
+
+
+def is_xml_content(data: Union[str, bytes]) -> bool:
+    """
+    Indica si el valor es el contenido de un documento XML y no una ruta, sin consultar el sistema de archivos
+    :param data:
+    :return: True si el primer caracter significativo es '<'
+    """
+    if isinstance(data, bytes):
+        return data.lstrip(XML_DOCUMENT_PADDING)[:1] == b'<'
+
+    return data.lstrip(XML_DOCUMENT_PADDING.decode('utf-8')).startswith('<')
+
+
+def iter_deserialize(
+        source: Union[str, Path, bytes, BinaryIO, zipfile.ZipFile, Iterable[bytes]],
+        target_class: Optional[Type[T]] = None) -> Iterator[T]:
+    return _default_codec.iter_deserialize(source, target_class)
+
+
+def cadena_original(obj: Union[object, str, bytes, Path], xslt: Union[str, Path, bytes] = None, prune: bool = False) -> str:
+    return _default_codec.cadena_original(obj, xslt, prune)
+
+
+def get_xslt_transform(xslt: Union[str, Path, bytes, Callable]) -> etree.XSLT:
+    """
+    Obtiene la transformación XSLT compilada para la hoja de estilos,
+    compilándola únicamente la primera vez que se solicita
+    :param xslt: Ruta, URL, contenido o callable que devuelve la hoja de estilos
+    :return:
+    """
+    if isinstance(xslt, Callable):
+        xslt = xslt()
+
+    key = _get_xslt_cache_key(xslt)
+    transform = _xslt_cache.get(key)
 
+    if transform is None:
+        transform = _get_xslt_transform(_get_element_tree(xslt))
+        _xslt_cache.put(key, transform)
 
-def cadena_original(obj: Union[object, str, bytes, Path], xslt: Union[str, Path, bytes] = None) -> str:
-    if not xslt and hasattr(obj, 'Meta') and hasattr(obj.Meta, 'stylesheet'):
-        xslt = obj.Meta.stylesheet
+    return transform
 
-    if not xslt:
-        raise ValueError('XSLT was not provided nor could it be found automatically for the object.')
 
-    xslt_root = __get_element_tree(xslt)
-    xml_root = __get_element_tree(obj)
+def get_pruned_xslt_transform(xslt: Union[str, Path, bytes, Callable], namespaces: Iterable[str]) -> etree.XSLT:
+    """
+    Obtiene la transformación compilada de la hoja de estilos sin los xsl:include de complementos
+    cuyas plantillas no aplican a ninguno de los namespaces. Se compila una vez por conjunto de namespaces
+    :param xslt: Ruta, URL, contenido o callable que devuelve la hoja de estilos
+    :param namespaces: Namespaces presentes en el documento, ver get_namespaces
+    :return:
+    """
+    if isinstance(xslt, Callable):
+        xslt = xslt()
 
-    transform = __get_xslt_transform(xslt_root)
-    result = transform(xml_root)
+    namespaces = frozenset(namespaces)
+    key = _get_xslt_cache_key(xslt) + ('prune', *sorted(namespaces))
+    transform = _xslt_cache.get(key)
 
-    return str(result)
+    if transform is None:
+        transform = _get_xslt_transform(_prune_stylesheet(_get_element_tree(xslt), namespaces))
+        _xslt_cache.put(key, transform)
 
+    return transform
 
-def __get_ns_map(obj: object) -> dict:
-    meta_classes = __get_meta_classes(obj)
+
+def get_namespaces(source: object) -> frozenset:
+    """
+    Namespaces de los nodos de un documento
+    :param source: Elemento o árbol de lxml, o dataclass; de un dataclass solo se revisan el propio
+        nodo y los complementos del comprobante y de sus conceptos
+    :return:
+    """
+    if isinstance(source, etree._ElementTree):
+        source = source.getroot()
+    if isinstance(source, etree._Element):
+        return frozenset(
+            element.tag[1:].split('}', 1)[0]
+            for element in source.iter(etree.Element) if element.tag.startswith('{')
+        )
+
+    complementos = getattr(source, 'complemento', None)
+    nodos = list(getattr(complementos[0] if isinstance(complementos, list) else complementos, 'any_element', []))
+    for concepto in getattr(getattr(source, 'conceptos', None), 'concepto', []):
+        nodos.extend(getattr(concepto.complemento_concepto, 'any_element', []))
+
+    namespaces = set()
+    for nodo in [source, *nodos]:
+        if isinstance(nodo, DerivedElement):
+            nodo = nodo.value
+        if isinstance(nodo, AnyElement):
+            namespaces.update(_get_any_element_namespaces(nodo))
+        elif getattr(getattr(nodo, 'Meta', None), 'namespace', None):
+            namespaces.add(nodo.Meta.namespace)
+
+    return frozenset(namespaces)
+
+
+def invalidate_xslt(xslt: Union[str, Path, bytes, Callable]) -> bool:
+    """
+    Elimina del cache la transformación compilada para la hoja de estilos
+    :param xslt: Ruta, URL, contenido o callable que devuelve la hoja de estilos
+    :return: True si la hoja de estilos se encontraba en el cache
+    """
+    if isinstance(xslt, Callable):
+        xslt = xslt()
+
+    return _xslt_cache.pop(_get_xslt_cache_key(xslt))
+
+
+def clear_xslt_cache() -> None:
+    _xslt_cache.clear()
+
+
+class Codec:
+    """
+    Serializador/deserializador reutilizable que conserva los metadatos de
+    las clases en un XmlContext de larga vida. Es seguro compartirlo entre hilos
+    """
+
+    def __init__(self, context: Optional[XmlContext] = None, warm: bool = True):
+        self.context = context or XmlContext()
+        self._local = threading.local()
+        self._serializers = {}
+        self._lock = threading.Lock()
+
+        if warm:
+            self.warm()
+
+    def warm(self, *classes: Type) -> None:
+        """
+        Construye por adelantado los metadatos de las clases y de sus nodos hijos
+        :param classes: Por omisión Comprobante y los complementos soportados
+        """
+        pending = [(clazz, None) for clazz in classes or (cfdv33.Comprobante, *COMPLEMENTO_TYPES_MAP.values())]
+        seen = set()
+
+        while pending:
+            clazz, parent_ns = pending.pop()
+            if clazz in seen:
+                continue
+
+            # Los nodos hijos heredan el namespace del padre, igual que al parsear
+            seen.add(clazz)
+            meta = self.context.build(clazz, parent_ns)
+            pending.extend((t, meta.namespace) for var in meta.vars for t in var.types if is_dataclass(t))
+
+    @property
+    def parser(self) -> XmlParser:
+        # XmlParser guarda el mapa de prefijos durante el parseo, por lo que se mantiene uno por hilo
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = self._local.parser = ComplementoParser(context=self.context)
+
+        return parser
+
+    def serializer(self, schema_location: Optional[str] = None, pretty_print: bool = False) -> XmlSerializer:
+        key = (schema_location, pretty_print)
+        serializer = self._serializers.get(key)
+
+        if serializer is None:
+            config = SerializerConfig(
+                xml_version='1.0',
+                encoding='UTF-8',
+                schema_location=schema_location,
+                pretty_print=pretty_print
+            )
+            serializer = XmlSerializer(config=config, context=self.context)
+
+            with self._lock:
+                serializer = self._serializers.setdefault(key, serializer)
+
+        return serializer
+
+    def serialize(self, obj: object, pretty_print: bool = False) -> str:
+        ns_map = _get_ns_map(obj)
+        schema_location = _get_ns_schema_location(obj)
+
+        return self.serializer(schema_location, pretty_print).render(obj, ns_map=ns_map)
+
+    def serialize_tree(self, obj: object) -> etree._ElementTree:
+        """
+        Construye el árbol de lxml del dataclass directamente a partir de los eventos del serializador,
+        sin generar y volver a parsear el texto del XML
+        :param obj:
+        :return: Árbol equivalente a parsear el resultado de serialize
+        """
+        ns_map = _get_ns_map(obj)
+        serializer = self.serializer(_get_ns_schema_location(obj))
+
+        writer = LxmlTreeWriter(config=serializer.config, output=None, ns_map=namespaces.clean_prefixes(ns_map))
+        writer.write(serializer.write_object(obj))
+
+        return writer.handler.etree
+
+    def cadena_original(
+            self,
+            obj: Union[object, str, bytes, Path],
+            xslt: Union[str, Path, bytes] = None,
+            prune: bool = False) -> str:
+        if not xslt and is_dataclass(obj):
+            try:
+                return cadenas.generar(obj)
+            except UnsupportedNodeError:
+                pass
+
+        if not xslt and hasattr(obj, 'Meta') and hasattr(obj.Meta, 'stylesheet'):
+            xslt = obj.Meta.stylesheet
+
+        if not xslt:
+            raise ValueError('XSLT was not provided nor could it be found automatically for the object.')
+
+        # Los dataclass se serializan con el XmlContext de este codec
+        xml_root = self.serialize_tree(obj) if is_dataclass(obj) else _get_element_tree(obj)
+        if prune:
+            transform = get_pruned_xslt_transform(xslt, get_namespaces(xml_root))
+        else:
+            transform = get_xslt_transform(xslt)
+
+        result = transform(xml_root)
+
+        return str(result)
+
+    def deserialize(self, resource: Union[str, Path, bytes], target_class: Optional[Type[T]] = None) -> Optional[T]:
+        # Solo se consulta el sistema de archivos cuando el texto no parece un documento XML
+        if isinstance(resource, bytes):
+            return self.deserialize_bytes(resource, target_class)
+        if isinstance(resource, Path):
+            return self.deserialize_path(resource, target_class)
+        if isinstance(resource, str) and not is_xml_content(resource) and os.path.isfile(resource):
+            return self.deserialize_path(resource, target_class)
+        if isinstance(resource, str):
+            return self.deserialize_string(resource, target_class)
+
+        return None
+
+    def deserialize_bytes(self, data: bytes, target_class: Optional[Type[T]] = None) -> Optional[T]:
+        return _set_complementos(self.parser.from_bytes(data, target_class))
+
+    def deserialize_string(self, data: str, target_class: Optional[Type[T]] = None) -> Optional[T]:
+        return _set_complementos(self.parser.from_string(data, target_class))
+
+    def deserialize_path(self, path: Union[str, Path], target_class: Optional[Type[T]] = None) -> Optional[T]:
+        return _set_complementos(self.parser.from_path(Path(path), target_class))
+
+    def iter_deserialize(
+            self,
+            source: Union[str, Path, bytes, BinaryIO, zipfile.ZipFile, Iterable[bytes]],
+            target_class: Optional[Type[T]] = None) -> Iterator[T]:
+        """
+        Deserializa uno a uno los documentos de un ZIP, un directorio, un volcado
+        de XMLs concatenados o un iterable de buffers, sin cargarlos todos en memoria
+        :param source: Ruta o archivo ZIP, directorio, archivo, bytes o iterable de bytes
+        :param target_class:
+        :return:
+        """
+        parser = self.parser
+
+        for document in iter_documents(source):
+            yield _set_complementos(parser.from_bytes(document, target_class))
+
+
+@dataclass
+class LxmlTreeWriter(XmlWriter):
+    """
+    XmlWriter que conserva el árbol de lxml construido con los eventos SAX en lugar de escribirlo
+    """
+
+    handler: ElementTreeContentHandler = field(init=False, default_factory=ElementTreeContentHandler)
+
+    def start_document(self):
+        # El árbol no lleva declaración XML
+        pass
+
+
+@dataclass
+class ComplementoParser(XmlParser):
+    """
+    XmlParser que enlaza los complementos conocidos a sus dataclasses
+    en la misma pasada, en lugar de dejarlos como AnyElement
+    """
+
+    def start(self, clazz: Optional[Type], queue: list, objects: list, qname: str, attrs: dict, ns_map: dict):
+        parent = queue[-1] if queue else None
+
+        types_map = _complemento_types.get(parent.meta.clazz) if isinstance(parent, ElementNode) else None
+        if types_map:
+            ns, tag = namespaces.split_qname(qname)
+            complemento_type = types_map.get(ns)
+
+            if complemento_type:
+                queue.append(ElementNode(
+                    meta=self.context.fetch(complemento_type),
+                    config=self.config,
+                    attrs=attrs,
+                    ns_map=ns_map,
+                    context=self.context,
+                    position=len(objects),
+                ))
+                return
+
+        super().start(clazz, queue, objects, qname, attrs, ns_map)
+
+
+class XsltCache:
+    """
+    Cache LRU de transformaciones XSLT compiladas, seguro para uso entre hilos
+    """
+
+    def __init__(self, maxsize: int = XSLT_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._transforms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[etree.XSLT]:
+        with self._lock:
+            transform = self._transforms.get(key)
+            if transform is not None:
+                self._transforms.move_to_end(key)
+
+            return transform
+
+    def put(self, key: tuple, transform: etree.XSLT) -> None:
+        with self._lock:
+            self._transforms[key] = transform
+            self._transforms.move_to_end(key)
+
+            while len(self._transforms) > self.maxsize:
+                self._transforms.popitem(last=False)
+
+    def pop(self, key: tuple) -> bool:
+        with self._lock:
+            return self._transforms.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._transforms.clear()
+
+    def __len__(self) -> int:
+        return len(self._transforms)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._transforms
+
+
+_xslt_cache = XsltCache()
+_default_codec = Codec(warm=False)
+
+
+def _get_ns_map(obj: object) -> dict:
+    meta_classes = _get_meta_classes(obj)
     ns_map = {}
 
     for meta in meta_classes:
@@ -83,8 +442,8 @@ def __get_ns_map(obj: object) -> dict:
     return ns_map
 
 
-def __get_ns_schema_location(obj: object) -> str:
-    meta_classes = __get_meta_classes(obj)
+def _get_ns_schema_location(obj: object) -> str:
+    meta_classes = _get_meta_classes(obj)
     schema_locations = [
         getattr(meta, 'namespace', '') + ' ' + getattr(meta, 'schema_location', '')
         for meta in meta_classes if hasattr(meta, 'schema_location')
@@ -93,7 +452,7 @@ def __get_ns_schema_location(obj: object) -> str:
     return ' '.join(schema_locations)
 
 
-def __get_meta_classes(obj: object) -> list:
+def _get_meta_classes(obj: object) -> list:
     meta_classes = []
     if hasattr(obj, 'Meta'):
         meta_classes.append(obj.Meta)
@@ -106,46 +465,179 @@ def __get_meta_classes(obj: object) -> list:
     return meta_classes
 
 
-def __get_xslt_transform(xslt_root: etree.ElementTree) -> etree.XSLT:
+def _get_xslt_transform(xslt_root: etree.ElementTree) -> etree.XSLT:
     return etree.XSLT(xslt_root)
 
 
-def __get_element_tree(source: Union[str, Path, bytes, object, Callable]) -> etree.ElementTree:
+def _set_complementos(obj: Optional[T]) -> Optional[T]:
+    if obj and hasattr(obj, 'complemento') and obj.complemento:
+        complementos = _get_complementos(obj)
+        setattr(obj.complemento, 'any_element', complementos)
+
+    return obj
+
+
+def _get_any_element_namespaces(element: AnyElement) -> Iterator[str]:
+    if element.qname and element.qname.startswith('{'):
+        yield element.qname[1:].split('}', 1)[0]
+
+    for child in element.children:
+        if isinstance(child, AnyElement):
+            yield from _get_any_element_namespaces(child)
+
+
+def _prune_stylesheet(tree: etree._ElementTree, namespaces: frozenset) -> etree._ElementTree:
+    # Los xsl:include sin plantillas match, como utilerias.xslt, se conservan siempre
+    base_url = tree.docinfo.URL
+    root = tree.getroot()
+
+    for include in root.findall(f'{{{XSL_NAMESPACE}}}include'):
+        href = include.get('href')
+        include_namespaces = _get_include_namespaces(urllib.parse.urljoin(base_url, href) if base_url else href)
+        if include_namespaces and include_namespaces.isdisjoint(namespaces):
+            root.remove(include)
+
+    return tree
+
+
+@functools.lru_cache(maxsize=None)
+def _get_include_namespaces(url: str) -> frozenset:
+    """
+    Namespaces de los nodos a los que aplican las plantillas match de una hoja de estilos incluida
+    """
+    namespaces = set()
+    for template in remote.parse(url).getroot().iterfind(f'{{{XSL_NAMESPACE}}}template[@match]'):
+        for prefix in XSLT_MATCH_PREFIX_PATTERN.findall(template.get('match')):
+            namespaces.add(template.nsmap.get(prefix))
+
+    namespaces.discard(None)
+
+    return frozenset(namespaces)
+
+
+def _get_complementos(obj: object) -> list:
+    obj.complemento = obj.complemento[0] if isinstance(obj.complemento, list) else obj.complemento
+
+    # El parser envuelve los dataclasses enlazados a un wildcard en un DerivedElement. Los
+    # complementos sin dataclass se conservan como AnyElement para no alterar la cadena original
+    return [
+        c.value if isinstance(c, DerivedElement) else c
+        for c in getattr(obj.complemento, 'any_element', [])
+    ]
+
+
+def iter_documents(source: Union[str, Path, bytes, BinaryIO, zipfile.ZipFile, Iterable[bytes]]) -> Iterator[bytes]:
+    """
+    Obtiene uno a uno los documentos XML de un ZIP, un directorio, un volcado
+    de XMLs concatenados o un iterable de buffers. Cada archivo del ZIP o del directorio y cada
+    buffer es un documento; en un volcado cada documento debe iniciar con su declaración <?xml,
+    que es lo que separa un documento del siguiente
+    """
+    if isinstance(source, zipfile.ZipFile):
+        yield from _iter_zip_documents(source)
+    elif isinstance(source, (str, Path)):
+        path = Path(source)
+
+        if path.is_dir():
+            for child in sorted(p for p in path.rglob('*') if p.is_file() and p.suffix.lower() == '.xml'):
+                yield child.read_bytes().strip(XML_DOCUMENT_PADDING)
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                yield from _iter_zip_documents(archive)
+        else:
+            with path.open('rb') as stream:
+                yield from _split_documents(stream)
+    elif isinstance(source, (bytes, bytearray)):
+        yield from _split_documents(io.BytesIO(source))
+    elif hasattr(source, 'read'):
+        if source.seekable() and zipfile.is_zipfile(source):
+            source.seek(0)
+            with zipfile.ZipFile(source) as archive:
+                yield from _iter_zip_documents(archive)
+        else:
+            yield from _split_documents(source)
+    else:
+        for buffer in source:
+            yield buffer.strip(XML_DOCUMENT_PADDING)
+
+
+def _iter_zip_documents(archive: zipfile.ZipFile) -> Iterator[bytes]:
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith('.xml'):
+            continue
+
+        yield archive.read(info).strip(XML_DOCUMENT_PADDING)
+
+
+def _split_documents(stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Separa un flujo de XMLs concatenados usando la declaración XML de cada documento. Un documento
+    sin declaración <?xml queda unido al anterior, por lo que solo el primero puede omitirla
+    """
+    buffer = bytearray()
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        # Solo se busca en lo nuevo y en la declaración que pudo quedar partida entre dos bloques
+        busqueda = max(1, len(buffer) - len('<?xml '))
+        buffer += chunk
+        inicio = 0
+        declaracion = XML_DECLARATION_PATTERN.search(buffer, busqueda)
+
+        while declaracion is not None:
+            fin = declaracion.start()
+            document = bytes(buffer[inicio:fin].strip(XML_DOCUMENT_PADDING))
+            if document:
+                yield document
+
+            inicio = fin
+            declaracion = XML_DECLARATION_PATTERN.search(buffer, inicio + 1)
+
+        del buffer[:inicio]
+
+    document = bytes(buffer.strip(XML_DOCUMENT_PADDING))
+    if document:
+        yield document
+
+
+def _get_xslt_cache_key(xslt: Union[str, Path, bytes]) -> tuple:
+    if isinstance(xslt, Path):
+        return 'path', str(xslt.resolve())
+
+    if isinstance(xslt, str):
+        import validators
+        if validators.url(xslt):
+            return 'url', xslt
+
+        xslt = xslt.encode()
+
+    if isinstance(xslt, bytes):
+        return 'sha256', hashlib.sha256(xslt).hexdigest()
+
+    raise ValueError(f'Unsupported XSLT source type: {type(xslt).__name__}')
+
+
+def _get_element_tree(source: Union[str, Path, bytes, object, Callable]) -> etree.ElementTree:
     if isinstance(source, Callable):
         source = source()
 
+    # Las URLs y sus xsl:include pasan por el cache de pycfdi.remote, que resuelve las del SAT
+    # con los archivos incluidos en el paquete
     if isinstance(source, str):
         import validators
         if validators.url(source):
-            return etree.parse(source)
+            return remote.parse(source)
 
-        return etree.XML(source.encode())
+        return etree.XML(source.encode(), remote.get_parser())
     if isinstance(source, Path):
-        return etree.parse(str(source))
+        return remote.parse(source)
     if isinstance(source, bytes):
         from io import BytesIO
-        return etree.parse(BytesIO(source))
+        return etree.parse(BytesIO(source), remote.get_parser())
     if is_dataclass(source):
-        return etree.XML(serialize(source).encode())
+        return serialize_tree(source)
 
     return None
-
-
-def __deserialize_complementos(obj: object) -> list:
-    complementos = []
-    if not obj or not hasattr(obj, 'complemento'):
-        return complementos
-
-    obj.complemento = obj.complemento[0] if isinstance(obj.complemento, list) else obj.complemento
-    for complemento in getattr(obj.complemento, 'any_element', []):
-        ns, tag = namespaces.split_qname(getattr(complemento, 'qname', ''))
-        complemento_type = COMPLEMENTO_TYPES_MAP.get(ns)
-
-        if not complemento_type:
-            continue
-
-        delattr(complemento, 'qname')
-        complemento = deserialize(serialize(complemento), complemento_type)
-        complementos.append(complemento)
-
-    return complementos
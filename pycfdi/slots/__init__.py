@@ -0,0 +1,131 @@
+"""
+Variantes con __slots__ de los modelos generados, para mantener en memoria grandes volúmenes de
+comprobantes sin el __dict__ de cada instancia. Se parsean, serializan y generan su cadena original
+igual que los modelos originales:
+
+    from pycfdi import serialization
+    from pycfdi.slots import cfdv33
+
+    comprobante = serialization.deserialize(xml, cfdv33.Comprobante)
+
+Los complementos de un comprobante con __slots__ también son variantes con __slots__, por lo que
+get_complemento_by_type debe recibir las clases de pycfdi.slots. Cada variante se registra en
+pycfdi.cadenas y pycfdi.validation para usar las plantillas y las reglas del modelo original
+"""
+import functools
+import typing
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass
+from pycfdi import cadenas, validation
+
+# Atributos que dataclass vuelve a generar para la variante
+_ATRIBUTOS_GENERADOS = frozenset((
+    '__annotations__', '__dataclass_fields__', '__dataclass_params__', '__dict__', '__eq__', '__hash__',
+    '__init__', '__match_args__', '__module__', '__qualname__', '__repr__', '__weakref__',
+))
+
+
+def slotted(cls: type, module: str) -> type:
+    """
+    Crea la variante con __slots__ de un modelo y de todas sus clases anidadas
+    :param cls: Dataclass raíz del modelo, por ejemplo cfdv33.Comprobante
+    :param module: Módulo donde se publica la variante con el mismo nombre, para poder usar pickle. No
+        define __NAMESPACE__ para que el parser siga eligiendo el modelo original cuando no se indica la clase
+    :return:
+    """
+    originales = set(_get_clases_anidadas(cls))
+    variantes = {}
+
+    def variante(original: type) -> type:
+        if original not in variantes:
+            variantes[original] = None
+            variantes[original] = _crear_variante(original, module, originales, variante)
+        elif variantes[original] is None:
+            raise ValueError(f'{original.__qualname__} references itself.')
+
+        return variantes[original]
+
+    return variante(cls)
+
+
+def _crear_variante(cls: type, module: str, originales: set, variante: typing.Callable) -> type:
+    def sustituir(tipo):
+        if tipo in originales:
+            return variante(tipo)
+
+        args = getattr(tipo, '__args__', None)
+        if args:
+            return tipo.copy_with(tuple(sustituir(arg) for arg in args))
+
+        return tipo
+
+    campos = fields(cls)
+    nombres = tuple(f.name for f in campos)
+    type_hints = typing.get_type_hints(cls)
+    namespace = {'__module__': module, '__qualname__': cls.__qualname__, '__annotations__': {}}
+
+    for nombre, valor in cls.__dict__.items():
+        if nombre in _ATRIBUTOS_GENERADOS or nombre in nombres:
+            continue
+        namespace[nombre] = variante(valor) if isinstance(valor, type) and valor in originales else valor
+
+    # Los tipos se resuelven aquí porque las referencias como "Comprobante.Emisor" apuntan a las
+    # clases del módulo original
+    for f in campos:
+        namespace['__annotations__'][f.name] = sustituir(type_hints[f.name])
+        namespace[f.name] = field(
+            default=f.default,
+            default_factory=f.default_factory,
+            init=f.init,
+            repr=f.repr,
+            hash=f.hash,
+            compare=f.compare,
+            metadata=f.metadata,
+        )
+
+    params = cls.__dataclass_params__
+    nueva = dataclass(
+        init=params.init,
+        repr=params.repr,
+        eq=params.eq,
+        order=params.order,
+        unsafe_hash=params.unsafe_hash,
+        frozen=params.frozen,
+    )(type(cls.__name__, (), namespace))
+
+    # Equivalente a dataclass(slots=True), disponible solo desde Python 3.10
+    atributos = {
+        nombre: valor for nombre, valor in nueva.__dict__.items()
+        if nombre not in nombres and nombre not in ('__dict__', '__weakref__')
+    }
+    atributos['__slots__'] = nombres
+    atributos['__qualname__'] = cls.__qualname__
+
+    # El __init__ de dataclass no asigna los campos init=False con valor fijo, como Version, porque
+    # los toma del atributo de clase que __slots__ no permite conservar
+    fijos = tuple((f.name, f.default) for f in campos if not f.init and f.default is not MISSING)
+    if fijos:
+        atributos['__init__'] = _init_con_fijos(nueva.__init__, fijos)
+
+    nueva = type(nueva)(nueva.__name__, nueva.__bases__, atributos)
+
+    cadenas.registrar_variante(cls, nueva)
+    validation.registrar_variante(cls, nueva)
+
+    return nueva
+
+
+def _init_con_fijos(init: typing.Callable, fijos: tuple) -> typing.Callable:
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        for nombre, valor in fijos:
+            object.__setattr__(self, nombre, valor)
+        init(self, *args, **kwargs)
+
+    return __init__
+
+
+def _get_clases_anidadas(cls: type) -> typing.Iterator[type]:
+    yield cls
+    for valor in vars(cls).values():
+        if isinstance(valor, type) and is_dataclass(valor):
+            yield from _get_clases_anidadas(valor)
@@ -0,0 +1,10 @@
+from pycfdi import cfdv33, serialization
+from pycfdi.slots import nomina12, pagos10, slotted, timbre_fiscal_digitalv11
+
+Comprobante = slotted(cfdv33.Comprobante, __name__)
+Cancelacion = slotted(cfdv33.Cancelacion, __name__)
+
+serialization.registrar_complementos(Comprobante.Complemento, {
+    complemento_type.Meta.namespace: complemento_type
+    for complemento_type in (pagos10.Pagos, timbre_fiscal_digitalv11.TimbreFiscalDigital, nomina12.Nomina)
+})
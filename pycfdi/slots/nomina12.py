@@ -0,0 +1,4 @@
+from pycfdi.complementos import nomina12
+from pycfdi.slots import slotted
+
+Nomina = slotted(nomina12.Nomina, __name__)
@@ -0,0 +1,4 @@
+from pycfdi.complementos import pagos10
+from pycfdi.slots import slotted
+
+Pagos = slotted(pagos10.Pagos, __name__)
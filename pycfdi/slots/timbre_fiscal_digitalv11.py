@@ -0,0 +1,4 @@
+from pycfdi.complementos import timbre_fiscal_digitalv11
+from pycfdi.slots import slotted
+
+TimbreFiscalDigital = slotted(timbre_fiscal_digitalv11.TimbreFiscalDigital, __name__)
@@ -0,0 +1,134 @@
+import collections
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Iterable, Optional
+from pycfdi import catalogos, cfdv33
+
+DECIMALES_MXN = 2
+
+Traslado = cfdv33.Comprobante.Impuestos.Traslados.Traslado
+Retencion = cfdv33.Comprobante.Impuestos.Retenciones.Retencion
+
+
+class Totales:
+    """
+    Acumula en una sola pasada los importes de los conceptos. Los traslados se agrupan
+    por (impuesto, tipo_factor, tasa_ocuota) y las retenciones por impuesto.
+    """
+
+    def __init__(self):
+        self.importe = Decimal(0)
+        self.descuento = Decimal(0)
+        self.con_descuento = False
+        self.traslados = collections.defaultdict(Decimal)
+        self.retenciones = collections.defaultdict(Decimal)
+
+    @classmethod
+    def from_conceptos(cls, conceptos: Iterable[cfdv33.Comprobante.Conceptos.Concepto]) -> 'Totales':
+        totales = cls()
+        for concepto in conceptos:
+            totales.agregar_concepto(concepto)
+
+        return totales
+
+    def agregar_concepto(self, concepto: cfdv33.Comprobante.Conceptos.Concepto) -> None:
+        self.importe += a_decimal(concepto.importe) or 0
+        if concepto.descuento is not None:
+            self.descuento += a_decimal(concepto.descuento) or 0
+            self.con_descuento = True
+
+        impuestos = concepto.impuestos
+        if impuestos is None:
+            return
+
+        if impuestos.traslados is not None:
+            for traslado in impuestos.traslados.traslado:
+                # Los traslados exentos no forman parte del resumen de impuestos
+                if traslado.tipo_factor != 'Exento':
+                    llave = (traslado.impuesto, traslado.tipo_factor, traslado.tasa_ocuota)
+                    self.traslados[llave] += a_decimal(traslado.importe) or 0
+
+        if impuestos.retenciones is not None:
+            for retencion in impuestos.retenciones.retencion:
+                self.retenciones[retencion.impuesto] += a_decimal(retencion.importe) or 0
+
+
+def calcular_totales(comprobante: cfdv33.Comprobante, decimales: Optional[int] = None) -> cfdv33.Comprobante:
+    """
+    Calcula SubTotal, Descuento, Total y el resumen de Impuestos a partir de los conceptos.
+    Los importes se redondean a los decimales de la moneda; los comprobantes T y P
+    llevan SubTotal y Total en cero
+    :param comprobante: Se modifica en el lugar
+    :param decimales: Decimales de la moneda; por omisión los de la Moneda del comprobante en c_Moneda
+    :return: El mismo comprobante
+    """
+    if decimales is None:
+        decimales = get_decimales_moneda(comprobante.moneda)
+
+    if comprobante.tipo_de_comprobante in ('T', 'P'):
+        comprobante.sub_total = '0'
+        comprobante.total = '0'
+        comprobante.descuento = None
+        comprobante.impuestos = None
+        return comprobante
+
+    totales = Totales.from_conceptos(comprobante.conceptos.concepto if comprobante.conceptos else [])
+    cuanto = Decimal(1).scaleb(-decimales)
+
+    def redondear(value: Decimal) -> Decimal:
+        return value.quantize(cuanto, ROUND_HALF_UP)
+
+    sub_total = redondear(totales.importe)
+    descuento = redondear(totales.descuento)
+    traslados = [
+        Traslado(impuesto=impuesto, tipo_factor=tipo_factor, tasa_ocuota=tasa_ocuota, importe=str(redondear(importe)))
+        for (impuesto, tipo_factor, tasa_ocuota), importe in totales.traslados.items()
+    ]
+    retenciones = [
+        Retencion(impuesto=impuesto, importe=str(redondear(importe)))
+        for impuesto, importe in totales.retenciones.items()
+    ]
+    total_trasladados = sum((Decimal(traslado.importe) for traslado in traslados), Decimal(0))
+    total_retenidos = sum((Decimal(retencion.importe) for retencion in retenciones), Decimal(0))
+
+    comprobante.sub_total = str(sub_total)
+    comprobante.descuento = str(descuento) if totales.con_descuento else None
+    comprobante.impuestos = None
+    if traslados or retenciones:
+        comprobante.impuestos = cfdv33.Comprobante.Impuestos(
+            traslados=cfdv33.Comprobante.Impuestos.Traslados(traslado=traslados) if traslados else None,
+            retenciones=cfdv33.Comprobante.Impuestos.Retenciones(retencion=retenciones) if retenciones else None,
+            total_impuestos_trasladados=str(redondear(total_trasladados)) if traslados else None,
+            total_impuestos_retenidos=str(redondear(total_retenidos)) if retenciones else None,
+        )
+
+    comprobante.total = str(redondear(sub_total - descuento + total_trasladados - total_retenidos))
+
+    return comprobante
+
+
+def get_decimales_moneda(moneda: Optional[str]) -> int:
+    """
+    Decimales de la moneda conforme al catálogo c_Moneda
+    :param moneda: Clave de c_Moneda
+    :return: DECIMALES_MXN si la moneda no existe o no se indica
+    """
+    registro = catalogos.moneda.get(moneda) if moneda else None
+
+    return int(registro.decimales) if registro is not None else DECIMALES_MXN
+
+
+def a_decimal(value) -> Optional[Decimal]:
+    """
+    Convierte un importe del modelo a Decimal
+    :param value: str, Decimal o None
+    :return: None si el valor no existe o no es un número finito, como NaN o Infinity
+    """
+    if value is None:
+        return None
+
+    try:
+        value = value if isinstance(value, Decimal) else Decimal(value)
+    except (InvalidOperation, TypeError):
+        return None
+
+    return value if value.is_finite() else None
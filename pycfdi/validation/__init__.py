@@ -0,0 +1,173 @@
+import importlib
+import importlib.util
+import operator
+import re
+from typing import Iterable, List, Optional
+
+RFC_GENERICOS = ['XAXX010101000', 'XEXX010101000']
+RFC_PATTERN = r'^([A-ZÑ&]{3,4}) ?(?:- ?)?(\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])) ?(?:- ?)?([A-Z\d]{2})([A\d])$'
+
+MOTIVO_PATRON = 'patron'
+MOTIVO_DIGITO_VERIFICADOR = 'digito_verificador'
+MOTIVO_GENERICO = 'generico'
+
+_RFC_REGEX = re.compile(RFC_PATTERN, re.ASCII)
+_rfc_match = _RFC_REGEX.match
+_RFC_CANONICO_REGEX = re.compile(r'^[A-ZÑ&0-9]+$')
+# Valor de cada caracter para el dígito verificador
+_VALORES_RFC = {c: i for i, c in enumerate("0123456789ABCDEFGHIJKLMN&OPQRSTUVWXYZ Ñ")}
+# Dígito verificador esperado según el residuo de la suma ponderada
+_DIGITOS_VERIFICADORES = tuple('0' if r == 0 else 'A' if r == 1 else str(11 - r) for r in range(11))
+
+# Los esquemas (lxml) y las reglas de negocio (modelos y catálogos) están en submódulos que se importan
+# al usarse, para que validar un RFC no cargue sus dependencias
+_ATRIBUTOS_SUBMODULOS = {
+    'XSD_NAMESPACE': 'esquemas',
+    'ESQUEMAS': 'esquemas',
+    'ESQUEMAS_COMPLEMENTOS': 'esquemas',
+    'validar_esquema': 'esquemas',
+    'CODIGO_NO_NUMERICO': 'reglas',
+    'IMPUESTOS_LOCALES_QNAME': 'reglas',
+    'REGLAS_CFDI33': 'reglas',
+    'ReglasContexto': 'reglas',
+    'RuleEngine': 'reglas',
+    'RuleError': 'reglas',
+    'validar_reglas': 'reglas',
+}
+
+# Variantes de los modelos con sus clases originales, que son las que tienen reglas registradas
+_variantes = {}
+
+
+def is_valid_rfc(rfc: str, aceptar_generico: bool = False) -> bool:
+    """
+    Valida RFC contra patrón general
+    y su digito verificador
+    :param rfc:
+    :param aceptar_generico: Considerar RFC Genérico como válido
+    :return:
+    """
+    return _get_motivo_rfc(rfc, aceptar_generico) is None
+
+
+def validar_rfcs(rfcs: Iterable[str], aceptar_generico: bool = False, usar_numpy: Optional[bool] = None) -> List[bool]:
+    """
+    Valida un lote de RFC con el mismo criterio que is_valid_rfc
+    :param rfcs:
+    :param aceptar_generico: Considerar RFC Genérico como válido
+    :param usar_numpy: Calcular los dígitos verificadores con NumPy; None lo usa si está instalado
+    :return: Resultado de cada RFC en el mismo orden
+    """
+    return [motivo is None for motivo in motivos_rfcs(rfcs, aceptar_generico, usar_numpy)]
+
+
+def motivos_rfcs(
+        rfcs: Iterable[str],
+        aceptar_generico: bool = False,
+        usar_numpy: Optional[bool] = None) -> List[Optional[str]]:
+    """
+    Indica por qué no es válido cada RFC de un lote
+    :param rfcs:
+    :param aceptar_generico: Considerar RFC Genérico como válido
+    :param usar_numpy: Calcular los dígitos verificadores con NumPy; None lo usa si está instalado
+    :return: MOTIVO_PATRON, MOTIVO_DIGITO_VERIFICADOR, MOTIVO_GENERICO o None si el RFC es válido
+    """
+    rfcs = rfcs if isinstance(rfcs, list) else list(rfcs)
+
+    if usar_numpy is None:
+        usar_numpy = importlib.util.find_spec('numpy') is not None
+
+    if not usar_numpy:
+        return [_get_motivo_rfc(rfc, aceptar_generico) for rfc in rfcs]
+
+    return _get_motivos_rfcs_numpy(rfcs, aceptar_generico)
+
+
+def _get_motivo_rfc(rfc: str, aceptar_generico: bool) -> Optional[str]:
+    if not _rfc_match(rfc):
+        return MOTIVO_PATRON
+
+    if _get_digito_verificador(rfc[:-1]) == rfc[-1]:
+        return None
+
+    return _get_motivo_digito_invalido(rfc, aceptar_generico)
+
+
+def _get_motivo_digito_invalido(rfc: str, aceptar_generico: bool) -> Optional[str]:
+    if rfc in RFC_GENERICOS:
+        return None if aceptar_generico else MOTIVO_GENERICO
+
+    return MOTIVO_DIGITO_VERIFICADOR
+
+
+def _get_digito_verificador(rfc_sin_digito: str) -> Optional[str]:
+    rfc_length = len(rfc_sin_digito)
+    # Ajuste para persona moral
+    suma = 0 if rfc_length == 12 else 481
+
+    try:
+        suma += sum(map(operator.mul, map(_VALORES_RFC.__getitem__, rfc_sin_digito), range(rfc_length + 1, 1, -1)))
+    except KeyError:
+        return None
+
+    return _DIGITOS_VERIFICADORES[suma % 11]
+
+
+def _get_motivos_rfcs_numpy(rfcs: List[str], aceptar_generico: bool) -> List[Optional[str]]:
+    """
+    Calcula los dígitos verificadores de los RFC sin separadores como una matriz uint8 de 13 columnas.
+    Los de persona moral se completan con un espacio a la izquierda, cuyo valor (37) por su peso (13)
+    es el ajuste de 481 del algoritmo. Los RFC con separadores se validan con el algoritmo normal
+    """
+    import numpy
+
+    motivos = [None] * len(rfcs)
+    indices = []
+    for i, rfc in enumerate(rfcs):
+        if not _RFC_REGEX.match(rfc):
+            motivos[i] = MOTIVO_PATRON
+        elif len(rfc) in (12, 13) and _RFC_CANONICO_REGEX.match(rfc):
+            indices.append(i)
+        else:
+            motivos[i] = _get_motivo_rfc(rfc, aceptar_generico)
+
+    if not indices:
+        return motivos
+
+    buffer = ''.join(rfcs[i].rjust(13) for i in indices).encode('latin-1')
+    matriz = numpy.frombuffer(buffer, dtype=numpy.uint8).reshape(len(indices), 13)
+
+    tabla = numpy.zeros(256, dtype=numpy.int64)
+    for caracter, valor in _VALORES_RFC.items():
+        tabla[caracter.encode('latin-1')[0]] = valor
+
+    sumas = tabla[matriz[:, :12]] @ numpy.arange(13, 1, -1, dtype=numpy.int64)
+    digitos = numpy.frombuffer(''.join(_DIGITOS_VERIFICADORES).encode(), dtype=numpy.uint8)
+    validos = digitos[sumas % 11] == matriz[:, 12]
+
+    for i in numpy.flatnonzero(~validos):
+        rfc = rfcs[indices[i]]
+        motivos[indices[i]] = _get_motivo_digito_invalido(rfc, aceptar_generico)
+
+    return motivos
+
+
+def registrar_variante(original: type, variante: type) -> None:
+    """
+    Evalúa sobre una clase las reglas registradas para otra con los mismos campos, como las variantes
+    con __slots__
+    :param original: Clase con reglas
+    :param variante:
+    """
+    _variantes[variante] = original
+
+
+def __getattr__(name: str):
+    if name in _ATRIBUTOS_SUBMODULOS:
+        return getattr(importlib.import_module(f'{__name__}.{_ATRIBUTOS_SUBMODULOS[name]}'), name)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATRIBUTOS_SUBMODULOS))
@@ -0,0 +1,124 @@
+import functools
+import os
+import threading
+import pycfdi.assets
+from dataclasses import is_dataclass
+from lxml import etree
+from typing import List, Union
+
+XSD_NAMESPACE = 'http://www.w3.org/2001/XMLSchema'
+
+# namespace: (schemaLocation publicado por el SAT, archivo incluido en pycfdi.assets.schemas)
+ESQUEMAS = {
+    'http://www.sat.gob.mx/cfd/3': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/3/cfdv33.xsd', 'cfdv33.xsd'),
+    'http://www.sat.gob.mx/Pagos': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/Pagos/Pagos10.xsd', 'Pagos10.xsd'),
+    'http://www.sat.gob.mx/nomina12': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/nomina/nomina12.xsd', 'nomina12.xsd'),
+    'http://www.sat.gob.mx/TimbreFiscalDigital': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/TimbreFiscalDigital/TimbreFiscalDigitalv11.xsd',
+        'TimbreFiscalDigitalv11.xsd'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/catalogos': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd', 'catCFDI.xsd'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/Nomina': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/Nomina/catNomina.xsd', 'catNomina.xsd'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/Pagos': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/Pagos/catPagos.xsd', 'catPagos.xsd'),
+    'http://www.sat.gob.mx/sitio_internet/cfd/tipoDatos/tdCFDI': (
+        'http://www.sat.gob.mx/sitio_internet/cfd/tipoDatos/tdCFDI/tdCFDI.xsd', 'tdCFDI.xsd'),
+}
+
+# Complementos que se validan dentro de cfdi:Complemento al validar un comprobante
+ESQUEMAS_COMPLEMENTOS = (
+    'http://www.sat.gob.mx/Pagos',
+    'http://www.sat.gob.mx/nomina12',
+    'http://www.sat.gob.mx/TimbreFiscalDigital',
+)
+
+
+def validar_esquema(xml_or_obj: Union[str, bytes, os.PathLike, object, etree._Element]) -> List[str]:
+    """
+    Valida el documento contra el esquema del namespace de su nodo raíz. Al validar un
+    comprobante se validan también, en la misma pasada, los complementos con esquema incluido;
+    los complementos sin esquema se omiten
+    :param xml_or_obj: Ruta, contenido XML, elemento de lxml o dataclass
+    :return: Mensajes de error; lista vacía si el documento es válido
+    """
+    root = _get_root(xml_or_obj)
+    namespace = etree.QName(root).namespace
+    if namespace not in ESQUEMAS:
+        raise ValueError(f'No schema is available for namespace {namespace}.')
+
+    schema, lock = _get_schema(namespace)
+    # El error_log pertenece al XMLSchema, por lo que la validación se serializa por esquema
+    with lock:
+        if schema.validate(root):
+            return []
+
+        return [f'{error.line}: {error.message}' for error in schema.error_log]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema(namespace: str) -> tuple:
+    parser = etree.XMLParser()
+    parser.resolvers.add(_SchemaResolver())
+
+    schema_location = ESQUEMAS[namespace][0]
+    document = etree.fromstring(_get_schema_bytes(namespace, root=True), parser, base_url=schema_location)
+
+    return etree.XMLSchema(document), threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_bytes(namespace: str, root: bool = False) -> bytes:
+    """
+    Lee el esquema incluido y le agrega los xs:import de los namespaces que usa, ya que
+    los esquemas del SAT se distribuyen sin ellos. El esquema raíz del comprobante importa
+    además los complementos y procesa sus comodines en modo lax, para validarlos en la misma pasada
+    """
+    filename = ESQUEMAS[namespace][1]
+    document = etree.fromstring(pycfdi.assets.get_bytes(pycfdi.assets.schemas.__name__, filename))
+
+    imports = {ns for ns in document.nsmap.values() if ns != namespace and ns in ESQUEMAS}
+    if root and namespace == 'http://www.sat.gob.mx/cfd/3':
+        imports.update(ESQUEMAS_COMPLEMENTOS)
+        for wildcard in document.iter(f'{{{XSD_NAMESPACE}}}any'):
+            wildcard.set('processContents', 'lax')
+
+    for ns in sorted(imports, reverse=True):
+        document.insert(0, etree.Element(
+            f'{{{XSD_NAMESPACE}}}import',
+            namespace=ns,
+            schemaLocation=ESQUEMAS[ns][0]
+        ))
+
+    return etree.tostring(document)
+
+
+class _SchemaResolver(etree.Resolver):
+    _namespaces = {schema_location: namespace for namespace, (schema_location, filename) in ESQUEMAS.items()}
+
+    def resolve(self, url, pubid, context):
+        namespace = self._namespaces.get(url)
+        if namespace is None:
+            return None
+
+        return self.resolve_string(_get_schema_bytes(namespace), context, base_url=url)
+
+
+def _get_root(source) -> etree._Element:
+    if isinstance(source, etree._ElementTree):
+        return source.getroot()
+    if isinstance(source, etree._Element):
+        return source
+    from pycfdi import serialization
+    if is_dataclass(source):
+        return serialization.serialize_tree(source).getroot()
+    if isinstance(source, os.PathLike) or (
+            isinstance(source, str) and not serialization.is_xml_content(source) and os.path.isfile(source)):
+        return etree.parse(os.fspath(source)).getroot()
+    if isinstance(source, str):
+        source = source.encode()
+
+    return etree.fromstring(source)
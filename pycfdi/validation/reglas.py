@@ -0,0 +1,423 @@
+import collections
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP, ROUND_UP
+from typing import Callable, Iterable, Iterator, List, Optional
+from pycfdi import catalogos, cfdv33
+from pycfdi.totales import Totales, a_decimal, get_decimales_moneda
+from pycfdi.validation import _variantes
+
+# Importes que no son números finitos. La matriz de errores del SAT no tiene un código para ellos
+# porque el esquema los rechaza antes de aplicar las reglas
+CODIGO_NO_NUMERICO = 'PYCFDI001'
+
+# Campos del modelo de los atributos numéricos
+_NOMBRES_CAMPOS = {
+    'Base': 'base',
+    'Cantidad': 'cantidad',
+    'Descuento': 'descuento',
+    'Importe': 'importe',
+    'SubTotal': 'sub_total',
+    'TasaOCuota': 'tasa_ocuota',
+    'TipoCambio': 'tipo_cambio',
+    'Total': 'total',
+    'TotalImpuestosRetenidos': 'total_impuestos_retenidos',
+    'TotalImpuestosTrasladados': 'total_impuestos_trasladados',
+    'ValorUnitario': 'valor_unitario',
+}
+
+IMPUESTOS_LOCALES_QNAME = '{http://www.sat.gob.mx/implocal}ImpuestosLocales'
+
+
+@dataclass(frozen=True)
+class RuleError:
+    codigo: str
+    mensaje: str
+    ruta: str = ''
+
+
+class RuleEngine:
+    """
+    Motor de reglas de negocio.
+
+    Las reglas se registran por tipo de nodo con el decorador ``regla``. Al validar un comprobante,
+    los conceptos se recorren una sola vez: en ese recorrido se evalúan las reglas de concepto y se
+    acumulan los importes que después reciben las reglas del comprobante en ``ReglasContexto``.
+    Las reglas de complementos (p. ej. pagos10.Pagos o nomina12.Nomina) se evalúan por su tipo.
+    """
+
+    def __init__(self):
+        self._reglas = collections.defaultdict(list)
+        self._compiladas = {}
+
+    def regla(self, tipo: type) -> Callable:
+        """
+        Registra una regla para los nodos del tipo indicado. La regla recibe el nodo, el
+        ReglasContexto y la ruta del nodo, y devuelve un iterable de RuleError
+        :param tipo:
+        :return: Decorador
+        """
+        def decorator(fn: Callable) -> Callable:
+            self._reglas[tipo].append(fn)
+            self._compiladas = {}
+            return fn
+
+        return decorator
+
+    def extend(self, engine: 'RuleEngine') -> 'RuleEngine':
+        """
+        Crea un motor con las reglas de este y las del motor indicado
+        :param engine:
+        :return:
+        """
+        nuevo = RuleEngine()
+        for reglas in (self._reglas, engine._reglas):
+            for tipo, fns in reglas.items():
+                nuevo._reglas[tipo].extend(fns)
+
+        return nuevo
+
+    def validar(self, obj: object) -> List[RuleError]:
+        """
+        Evalúa todas las reglas sobre el comprobante o complemento
+        :param obj:
+        :return: Errores encontrados; lista vacía si no hay errores
+        """
+        contexto = ReglasContexto(obj)
+        errores = []
+
+        if issubclass(_variantes.get(type(obj), type(obj)), cfdv33.Comprobante):
+            reglas_concepto = self._get_reglas(cfdv33.Comprobante.Conceptos.Concepto)
+            conceptos = obj.conceptos.concepto if obj.conceptos else []
+            for indice, concepto in enumerate(conceptos):
+                contexto.agregar_concepto(concepto)
+                for fn in reglas_concepto:
+                    errores.extend(fn(concepto, contexto, f'Conceptos.Concepto[{indice}]'))
+
+            for complemento in _get_complementos(obj):
+                for fn in self._get_reglas(type(complemento)):
+                    errores.extend(fn(complemento, contexto, 'Complemento'))
+
+        for fn in self._get_reglas(type(obj)):
+            errores.extend(fn(obj, contexto, ''))
+
+        return errores
+
+    def _get_reglas(self, tipo: type) -> tuple:
+        try:
+            return self._compiladas[tipo]
+        except KeyError:
+            reglas = self._compiladas[tipo] = tuple(self._reglas.get(_variantes.get(tipo, tipo), ()))
+            return reglas
+
+
+class ReglasContexto(Totales):
+    """
+    Importes acumulados de los conceptos durante el recorrido del motor de reglas
+    """
+
+    def __init__(self, obj: object):
+        super().__init__()
+        self.obj = obj
+        self._cuanto = None
+
+    def redondear(self, value: Decimal) -> Decimal:
+        """
+        Redondea una suma de los conceptos a los decimales de la Moneda del comprobante, igual que
+        totales.calcular_totales, para compararla con el importe registrado
+        :param value:
+        :return:
+        """
+        if self._cuanto is None:
+            self._cuanto = Decimal(1).scaleb(-get_decimales_moneda(getattr(self.obj, 'moneda', None)))
+
+        return value.quantize(self._cuanto, ROUND_HALF_UP)
+
+
+def validar_reglas(obj: object, engine: Optional[RuleEngine] = None) -> List[RuleError]:
+    """
+    Valida las reglas de negocio del comprobante antes de enviarlo a timbrar
+    :param obj: cfdv33.Comprobante o complemento con reglas registradas
+    :param engine: Motor de reglas; por omisión REGLAS_CFDI33
+    :return: Errores encontrados; lista vacía si no hay errores
+    """
+    return (engine or REGLAS_CFDI33).validar(obj)
+
+
+def _get_complementos(comprobante: cfdv33.Comprobante) -> list:
+    complementos = comprobante.complemento[0] if isinstance(comprobante.complemento, list) else comprobante.complemento
+
+    return getattr(complementos, 'any_element', [])
+
+
+def _validar_numeros(nodo: object, atributos: Iterable[str], ruta: str) -> Iterator[RuleError]:
+    """
+    Reporta los atributos con valor que no es un número finito, como NaN o Infinity, que las demás
+    reglas omiten
+    """
+    for atributo in atributos:
+        valor = getattr(nodo, _NOMBRES_CAMPOS[atributo])
+        if valor is not None and a_decimal(valor) is None:
+            yield RuleError(
+                CODIGO_NO_NUMERICO, f'El {atributo} no es un número.', f'{ruta}.{atributo}' if ruta else atributo
+            )
+
+
+def _decimales(value: Decimal) -> int:
+    exponent = value.as_tuple().exponent
+    return -exponent if exponent < 0 else 0
+
+
+def _is_dentro_de_limites(importe: Decimal, inferior: Decimal, superior: Decimal) -> bool:
+    """
+    Límites de redondeo del Anexo 20: el inferior se trunca y el superior se redondea
+    hacia arriba a los decimales del importe
+    """
+    cuanto = Decimal(1).scaleb(-_decimales(importe))
+
+    return inferior.quantize(cuanto, ROUND_DOWN) <= importe <= superior.quantize(cuanto, ROUND_UP)
+
+
+def _get_variacion(value: Decimal) -> Decimal:
+    # Mitad de la unidad del último decimal registrado
+    return Decimal(1).scaleb(-_decimales(value)) / 2
+
+
+REGLAS_CFDI33 = RuleEngine()
+_regla_comprobante = REGLAS_CFDI33.regla(cfdv33.Comprobante)
+_regla_concepto = REGLAS_CFDI33.regla(cfdv33.Comprobante.Conceptos.Concepto)
+
+
+@_regla_comprobante
+def _regla_numeros(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    yield from _validar_numeros(comprobante, ('SubTotal', 'Descuento', 'TipoCambio', 'Total'), '')
+
+    impuestos = comprobante.impuestos
+    if impuestos is None:
+        return
+
+    yield from _validar_numeros(impuestos, ('TotalImpuestosRetenidos', 'TotalImpuestosTrasladados'), 'Impuestos')
+    retenciones = impuestos.retenciones.retencion if impuestos.retenciones else []
+    for indice, retencion in enumerate(retenciones):
+        yield from _validar_numeros(retencion, ('Importe',), f'Impuestos.Retenciones.Retencion[{indice}]')
+
+    traslados = impuestos.traslados.traslado if impuestos.traslados else []
+    for indice, traslado in enumerate(traslados):
+        yield from _validar_numeros(traslado, ('TasaOCuota', 'Importe'), f'Impuestos.Traslados.Traslado[{indice}]')
+
+
+@_regla_comprobante
+def _regla_catalogos(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    if comprobante.forma_pago is not None and comprobante.forma_pago not in catalogos.forma_pago:
+        yield RuleError('CFDI33104', 'La clave de FormaPago no se encuentra en el catálogo c_FormaPago.', 'FormaPago')
+    if comprobante.tipo_de_comprobante not in catalogos.tipo_de_comprobante:
+        yield RuleError(
+            'CFDI33120', 'La clave de TipoDeComprobante no se encuentra en el catálogo c_TipoDeComprobante.',
+            'TipoDeComprobante'
+        )
+    if comprobante.metodo_pago is not None and comprobante.metodo_pago not in catalogos.metodo_pago:
+        yield RuleError('CFDI33121', 'La clave de MetodoPago no se encuentra en el catálogo c_MetodoPago.', 'MetodoPago')
+
+
+@_regla_comprobante
+def _regla_sub_total(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    sub_total = a_decimal(comprobante.sub_total)
+    descuento = a_decimal(comprobante.descuento)
+    if sub_total is None:
+        return
+
+    if comprobante.tipo_de_comprobante in ('T', 'P'):
+        if sub_total != 0:
+            yield RuleError('CFDI33108', 'El SubTotal debe ser cero para los tipos de comprobante T y P.', 'SubTotal')
+    elif sub_total != contexto.redondear(contexto.importe):
+        yield RuleError('CFDI33107', 'El SubTotal no es igual a la suma de los importes de los conceptos.', 'SubTotal')
+
+    if descuento is not None and descuento > sub_total:
+        yield RuleError('CFDI33109', 'El Descuento es mayor que el SubTotal.', 'Descuento')
+
+
+@_regla_comprobante
+def _regla_tipo_cambio(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    tipo_cambio = a_decimal(comprobante.tipo_cambio)
+
+    if comprobante.moneda == 'MXN':
+        if tipo_cambio is not None and tipo_cambio != 1:
+            yield RuleError('CFDI33113', 'El TipoCambio debe ser 1 cuando la Moneda es MXN.', 'TipoCambio')
+    elif comprobante.moneda == 'XXX':
+        if comprobante.tipo_cambio is not None:
+            yield RuleError('CFDI33115', 'El TipoCambio no debe registrarse cuando la Moneda es XXX.', 'TipoCambio')
+    elif comprobante.tipo_cambio is None:
+        yield RuleError('CFDI33114', 'El TipoCambio es requerido cuando la Moneda es distinta de MXN y XXX.', 'TipoCambio')
+
+
+@_regla_comprobante
+def _regla_total(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    total = a_decimal(comprobante.total)
+    sub_total = a_decimal(comprobante.sub_total)
+    if total is None or sub_total is None:
+        return
+
+    impuestos = comprobante.impuestos
+    esperado = sub_total - (a_decimal(comprobante.descuento) or 0)
+    if impuestos is not None:
+        esperado += a_decimal(impuestos.total_impuestos_trasladados) or 0
+        esperado -= a_decimal(impuestos.total_impuestos_retenidos) or 0
+
+    # Impuestos locales, se conservan como AnyElement al deserializar
+    for complemento in _get_complementos(comprobante):
+        if getattr(complemento, 'qname', None) == IMPUESTOS_LOCALES_QNAME:
+            esperado += a_decimal(complemento.attributes.get('TotaldeTraslados')) or 0
+            esperado -= a_decimal(complemento.attributes.get('TotaldeRetenciones')) or 0
+
+    if total != esperado:
+        yield RuleError(
+            'CFDI33118',
+            'El Total no es igual al SubTotal menos el Descuento más los impuestos trasladados '
+            'menos los impuestos retenidos.',
+            'Total'
+        )
+
+
+@_regla_comprobante
+def _regla_impuestos(comprobante: cfdv33.Comprobante, contexto: ReglasContexto, ruta: str) -> Iterator[RuleError]:
+    impuestos = comprobante.impuestos
+    if impuestos is None:
+        return
+
+    retenciones = impuestos.retenciones.retencion if impuestos.retenciones else []
+    total_retenidos = a_decimal(impuestos.total_impuestos_retenidos)
+    if total_retenidos is not None and total_retenidos != sum(a_decimal(r.importe) or 0 for r in retenciones):
+        yield RuleError(
+            'CFDI33180', 'El TotalImpuestosRetenidos no es igual a la suma de los importes de las retenciones.',
+            'Impuestos.TotalImpuestosRetenidos'
+        )
+
+    traslados = impuestos.traslados.traslado if impuestos.traslados else []
+    total_trasladados = a_decimal(impuestos.total_impuestos_trasladados)
+    if total_trasladados is not None and total_trasladados != sum(a_decimal(t.importe) or 0 for t in traslados):
+        yield RuleError(
+            'CFDI33182', 'El TotalImpuestosTrasladados no es igual a la suma de los importes de los traslados.',
+            'Impuestos.TotalImpuestosTrasladados'
+        )
+
+    for indice, retencion in enumerate(retenciones):
+        retenido = contexto.redondear(contexto.retenciones.get(retencion.impuesto, Decimal(0)))
+        if a_decimal(retencion.importe) != retenido:
+            yield RuleError(
+                'CFDI33188',
+                'El Importe de la retención no es igual a la suma de las retenciones de los conceptos con el mismo impuesto.',
+                f'Impuestos.Retenciones.Retencion[{indice}]'
+            )
+
+    for indice, traslado in enumerate(traslados):
+        llave = (traslado.impuesto, traslado.tipo_factor, traslado.tasa_ocuota)
+        if a_decimal(traslado.importe) != contexto.redondear(contexto.traslados.get(llave, Decimal(0))):
+            yield RuleError(
+                'CFDI33195',
+                'El Importe del traslado no es igual a la suma de los traslados de los conceptos '
+                'con el mismo impuesto, tipo factor y tasa o cuota.',
+                f'Impuestos.Traslados.Traslado[{indice}]'
+            )
+
+
+@_regla_concepto
+def _regla_concepto_numeros(
+        concepto: cfdv33.Comprobante.Conceptos.Concepto,
+        contexto: ReglasContexto,
+        ruta: str) -> Iterator[RuleError]:
+    yield from _validar_numeros(concepto, ('Cantidad', 'ValorUnitario', 'Importe', 'Descuento'), ruta)
+
+    impuestos = concepto.impuestos
+    if impuestos is None:
+        return
+
+    traslados = impuestos.traslados.traslado if impuestos.traslados else []
+    for indice, traslado in enumerate(traslados):
+        yield from _validar_numeros(
+            traslado, ('Base', 'TasaOCuota', 'Importe'), f'{ruta}.Impuestos.Traslados.Traslado[{indice}]'
+        )
+
+    retenciones = impuestos.retenciones.retencion if impuestos.retenciones else []
+    for indice, retencion in enumerate(retenciones):
+        yield from _validar_numeros(
+            retencion, ('Base', 'TasaOCuota', 'Importe'), f'{ruta}.Impuestos.Retenciones.Retencion[{indice}]'
+        )
+
+
+@_regla_concepto
+def _regla_concepto_importe(
+        concepto: cfdv33.Comprobante.Conceptos.Concepto,
+        contexto: ReglasContexto,
+        ruta: str) -> Iterator[RuleError]:
+    importe = a_decimal(concepto.importe)
+    cantidad = a_decimal(concepto.cantidad)
+    valor_unitario = a_decimal(concepto.valor_unitario)
+    if importe is None or cantidad is None or valor_unitario is None:
+        return
+
+    variacion_cantidad = _get_variacion(cantidad)
+    variacion_valor_unitario = _get_variacion(valor_unitario)
+    inferior = (cantidad - variacion_cantidad) * (valor_unitario - variacion_valor_unitario)
+    superior = (cantidad + variacion_cantidad) * (valor_unitario + variacion_valor_unitario)
+    if not _is_dentro_de_limites(importe, inferior, superior):
+        yield RuleError(
+            'CFDI33149', 'El Importe del concepto no se encuentra entre los límites permitidos.', f'{ruta}.Importe'
+        )
+
+    descuento = a_decimal(concepto.descuento)
+    if descuento is not None and descuento > importe:
+        yield RuleError('CFDI33151', 'El Descuento del concepto es mayor que su Importe.', f'{ruta}.Descuento')
+
+
+@_regla_concepto
+def _regla_concepto_impuestos(
+        concepto: cfdv33.Comprobante.Conceptos.Concepto,
+        contexto: ReglasContexto,
+        ruta: str) -> Iterator[RuleError]:
+    impuestos = concepto.impuestos
+    if impuestos is None:
+        return
+
+    traslados = impuestos.traslados.traslado if impuestos.traslados else []
+    for indice, traslado in enumerate(traslados):
+        ruta_traslado = f'{ruta}.Impuestos.Traslados.Traslado[{indice}]'
+        base = a_decimal(traslado.base)
+        if base is not None and base <= 0:
+            yield RuleError('CFDI33154', 'La Base del traslado debe ser mayor que cero.', f'{ruta_traslado}.Base')
+
+        if traslado.tipo_factor == 'Exento':
+            if traslado.tasa_ocuota is not None or traslado.importe is not None:
+                yield RuleError(
+                    'CFDI33157', 'Un traslado Exento no debe registrar TasaOCuota ni Importe.', ruta_traslado
+                )
+        elif traslado.tasa_ocuota is None or traslado.importe is None:
+            yield RuleError(
+                'CFDI33158', 'Un traslado con Tasa o Cuota debe registrar TasaOCuota e Importe.', ruta_traslado
+            )
+        else:
+            yield from _validar_importe_impuesto(traslado, 'CFDI33161', ruta_traslado)
+
+    retenciones = impuestos.retenciones.retencion if impuestos.retenciones else []
+    for indice, retencion in enumerate(retenciones):
+        ruta_retencion = f'{ruta}.Impuestos.Retenciones.Retencion[{indice}]'
+        base = a_decimal(retencion.base)
+        if base is not None and base <= 0:
+            yield RuleError('CFDI33163', 'La Base de la retención debe ser mayor que cero.', f'{ruta_retencion}.Base')
+
+        if retencion.tipo_factor == 'Exento':
+            yield RuleError('CFDI33166', 'El TipoFactor de una retención no puede ser Exento.', ruta_retencion)
+        elif retencion.tasa_ocuota is not None and retencion.importe is not None:
+            yield from _validar_importe_impuesto(retencion, 'CFDI33169', ruta_retencion)
+
+
+def _validar_importe_impuesto(impuesto, codigo: str, ruta: str) -> Iterator[RuleError]:
+    importe = a_decimal(impuesto.importe)
+    base = a_decimal(impuesto.base)
+    tasa_ocuota = a_decimal(impuesto.tasa_ocuota)
+    if importe is None or base is None or tasa_ocuota is None:
+        return
+
+    variacion_base = _get_variacion(base)
+    inferior = (base - variacion_base) * tasa_ocuota
+    superior = (base + variacion_base) * tasa_ocuota
+    if not _is_dentro_de_limites(importe, inferior, superior):
+        yield RuleError(codigo, 'El Importe del impuesto no se encuentra entre los límites permitidos.', f'{ruta}.Importe')
@@ -0,0 +1,49 @@
+from pycfdi import assets, cfdv33
+from pycfdi.complementos import timbre_fiscal_digitalv11
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+
+class TestAssets(unittest.TestCase):
+    def test_rutas_estables(self):
+        path = cfdv33.Comprobante.Meta.stylesheet()
+
+        self.assertTrue(path.is_file())
+        self.assertTrue(cfdv33.Comprobante.Meta.schema().is_file())
+        self.assertTrue(timbre_fiscal_digitalv11.TimbreFiscalDigital.Meta.stylesheet().is_file())
+        self.assertEqual(path, assets.get_path(assets.stylesheets.__name__, 'cadenaoriginal_3_3.xslt'))
+
+    def test_bytes_y_documentos_se_leen_una_vez(self):
+        registry = assets.AssetRegistry()
+        args = (assets.schemas.__name__, 'cfdv33.xsd')
+
+        self.assertIs(registry.get_bytes(*args), registry.get_bytes(*args))
+        self.assertEqual(registry.get_path(*args).read_bytes(), registry.get_bytes(*args))
+        document = registry.get_document(*args)
+        self.assertIs(document, registry.get_document(*args))
+        self.assertEqual(str(registry.get_path(*args)), document.docinfo.URL)
+
+    def test_extrae_paquete_desde_zip(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = os.path.join(directorio, 'recursos.zip')
+            with zipfile.ZipFile(archivo, 'w') as zf:
+                zf.writestr('recursos_prueba/__init__.py', '')
+                zf.writestr('recursos_prueba/principal.xslt', '<xsl:include href="utilerias.xslt"/>')
+                zf.writestr('recursos_prueba/utilerias.xslt', '<utilerias/>')
+
+            sys.path.insert(0, archivo)
+            try:
+                registry = assets.AssetRegistry()
+                path = registry.get_path('recursos_prueba', 'principal.xslt')
+
+                self.assertNotIn(archivo, str(path))
+                self.assertEqual(b'<utilerias/>', (path.parent / 'utilerias.xslt').read_bytes())
+                self.assertEqual(path.parent, registry.get_path('recursos_prueba', 'utilerias.xslt').parent)
+            finally:
+                sys.path.remove(archivo)
+                sys.modules.pop('recursos_prueba', None)
+                importlib.invalidate_caches()
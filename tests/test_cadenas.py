@@ -0,0 +1,76 @@
+from lxml import etree
+from pycfdi import cadenas, cfdv33, serialization
+from pycfdi.complementos import nomina12, pagos10, timbre_fiscal_digitalv11
+from pycfdi.exceptions.cadenas import UnsupportedNodeError
+import glob
+import os
+import unittest
+
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
+
+
+class TestCadenas(unittest.TestCase):
+    def test_cadena_original_nativa_igual_a_xslt_para_todos_los_xml_prueba(self):
+        for path in self._get_test_xml_paths():
+            with self.subTest(xml=os.path.basename(path)):
+                comprobante = serialization.deserialize(path)
+
+                self.assertEqual(
+                    self._cadena_original_xslt(comprobante),
+                    serialization.cadena_original(comprobante)
+                )
+
+    def test_cadena_original_nativa_igual_a_xslt_del_archivo(self):
+        for filename in ('CFDI.xml', 'nomina.xml', 'pago.xml'):
+            with self.subTest(xml=filename):
+                path = os.path.join(TEST_XMLS_PATH, filename)
+                comprobante = serialization.deserialize(path)
+                xslt = serialization.get_xslt_transform(cfdv33.Comprobante.Meta.stylesheet)
+
+                self.assertEqual(str(xslt(etree.parse(path))), cadenas.generar(comprobante))
+
+    def test_cadena_original_tfd_nativa_igual_a_xslt(self):
+        for path in self._get_test_xml_paths():
+            comprobante = serialization.deserialize(path)
+            tfd = comprobante.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+            if not tfd:
+                continue
+
+            with self.subTest(xml=os.path.basename(path)):
+                self.assertEqual(self._cadena_original_xslt(tfd), cadenas.generar(tfd))
+
+    def test_cadena_original_nativa_para_comprobante_vacio(self):
+        comprobante = cfdv33.Comprobante()
+
+        self.assertEqual(self._cadena_original_xslt(comprobante), cadenas.generar(comprobante))
+
+    def test_normaliza_espacios_y_omite_opcionales(self):
+        comprobante = cfdv33.Comprobante(
+            serie='  A \t B\n',
+            emisor=cfdv33.Comprobante.Emisor(rfc='EWE1709045U0', regimen_fiscal='601'),
+            complemento=[cfdv33.Comprobante.Complemento(any_element=[
+                pagos10.Pagos(pago=[pagos10.Pagos.Pago(monto='10.00')]),
+                nomina12.Nomina(receptor=nomina12.Nomina.Receptor(
+                    curp='XEXX010101HNEXXXA4',
+                    sindicalizado=nomina12.ReceptorSindicalizado.SI
+                )),
+            ])]
+        )
+
+        self.assertEqual(self._cadena_original_xslt(comprobante), cadenas.generar(comprobante))
+
+    def test_raises_error_for_unsupported_complemento(self):
+        comprobante = serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'Iedu.xml'))
+
+        with self.assertRaises(UnsupportedNodeError):
+            cadenas.generar(comprobante)
+
+    @staticmethod
+    def _cadena_original_xslt(obj: object) -> str:
+        xslt = serialization.get_xslt_transform(obj.Meta.stylesheet)
+
+        return str(xslt(etree.XML(serialization.serialize(obj).encode())))
+
+    @staticmethod
+    def _get_test_xml_paths() -> list:
+        return sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml')))
@@ -0,0 +1,120 @@
+from pycfdi import catalogos, exceptions
+from tools import compilar_catalogos
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+class TestCatalogos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_get_catalogo_incluido(self):
+        registro = catalogos.uso_cfdi.get('G03')
+
+        self.assertEqual('G03', registro.clave)
+        self.assertEqual('Gastos en general', registro.descripcion)
+
+    def test_get_moneda(self):
+        registro = catalogos.moneda.get('MXN')
+
+        self.assertEqual('Peso Mexicano', registro.descripcion)
+        self.assertEqual('2', registro.decimales)
+        self.assertIn('XXX', catalogos.moneda)
+
+    def test_catalogos_incluidos_corresponden_a_sus_csv(self):
+        self.assertEqual([], compilar_catalogos.verificar_catalogos())
+
+    def test_contains_catalogo_incluido(self):
+        self.assertIn('PUE', catalogos.metodo_pago)
+        self.assertNotIn('PUEX', catalogos.metodo_pago)
+        self.assertNotIn('PU', catalogos.metodo_pago)
+
+    def test_get_clave_inexistente(self):
+        self.assertIsNone(catalogos.forma_pago.get('00'))
+        with self.assertRaises(KeyError):
+            catalogos.forma_pago['00']
+
+    def test_compilar_y_buscar(self):
+        path = os.path.join(self.tmp.name, 'c_CodigoPostal.cat')
+        filas = [(f'{i:05d}', f'Estado {i % 32}') for i in range(1000)]
+
+        self.assertEqual(1000, catalogos.compilar(filas, ['clave', 'estado'], path))
+
+        catalogo = catalogos.Catalogo('c_CodigoPostal', path)
+        self.assertEqual(1000, len(catalogo))
+        self.assertEqual(('clave', 'estado'), catalogo.columnas)
+        self.assertEqual(filas, [tuple(registro) for registro in catalogo])
+        for clave, estado in filas:
+            self.assertEqual(estado, catalogo[clave].estado)
+        self.assertNotIn('99999', catalogo)
+
+    def test_compilar_csv(self):
+        origen = os.path.join(self.tmp.name, 'c_Moneda.csv')
+        with open(origen, 'w', encoding='utf-8') as f:
+            f.write('c_Moneda,Descripción,Decimales\nMXN,Peso Mexicano,2\nUSD,Dolar americano,2\n')
+
+        catalogos.compilar_csv(origen, os.path.join(self.tmp.name, 'c_Moneda.cat'))
+
+        with mock.patch.dict(os.environ, {catalogos.CATALOGOS_PATH_ENV: self.tmp.name}):
+            catalogo = catalogos.Catalogo('c_Moneda')
+            self.assertEqual('Peso Mexicano', catalogo.get('MXN').descripcion)
+            self.assertEqual(('c_moneda', 'descripcion', 'decimales'), catalogo.columnas)
+
+    def test_catalogo_no_disponible(self):
+        with mock.patch.dict(os.environ, {catalogos.CATALOGOS_PATH_ENV: self.tmp.name}):
+            with self.assertRaises(exceptions.catalogos.CatalogNotFoundError):
+                catalogos.Catalogo('c_ClaveProdServ').get('01010101')
+
+    def test_compilar_directorio_de_catalogos_extensos(self):
+        origen = os.path.join(self.tmp.name, 'csv')
+        destino = os.path.join(self.tmp.name, 'catalogos')
+        os.mkdir(origen)
+        with open(os.path.join(origen, 'c_ClaveProdServ.csv'), 'w', encoding='utf-8') as f:
+            f.write('c_ClaveProdServ,Descripción\n01010101,No existe en el catálogo\n10101500,Animales vivos\n')
+
+        with mock.patch.dict(os.environ, {catalogos.CATALOGOS_PATH_ENV: destino}):
+            self.assertEqual(['c_ClaveProdServ'], catalogos.compilar_directorio(origen))
+
+            catalogo = catalogos.Catalogo(catalogos.clave_prod_serv.nombre)
+            self.assertEqual('No existe en el catálogo', catalogo.get('01010101').descripcion)
+            self.assertIn('10101500', catalogo)
+
+    def test_compilar_directorio_sin_destino(self):
+        with mock.patch.dict(os.environ, {catalogos.CATALOGOS_PATH_ENV: ''}):
+            with self.assertRaises(ValueError):
+                catalogos.compilar_directorio(self.tmp.name)
+
+    def test_catalogo_incluido_se_resuelve_con_registro_de_assets(self):
+        path = Path(self.tmp.name, 'c_Prueba.cat')
+        catalogos.compilar([('01', 'Uno')], ['clave', 'descripcion'], path)
+
+        with mock.patch('pycfdi.assets.get_path', return_value=path) as get_path:
+            self.assertEqual('Uno', catalogos.Catalogo('c_Prueba').get('01').descripcion)
+
+        get_path.assert_called_once_with('pycfdi.assets.catalogos', 'c_Prueba.cat')
+
+    def test_catalogo_vacio(self):
+        path = os.path.join(self.tmp.name, 'vacio.cat')
+        catalogos.compilar([], ['clave'], path)
+
+        self.assertNotIn('01', catalogos.Catalogo('vacio', path))
+
+    def test_archivo_invalido(self):
+        path = os.path.join(self.tmp.name, 'invalido.cat')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 32)
+
+        with self.assertRaises(exceptions.catalogos.InvalidCatalogError):
+            catalogos.Catalogo('invalido', path).get('01')
+
+    def test_pickle(self):
+        self.assertIn('G01', catalogos.uso_cfdi)
+
+        copia = pickle.loads(pickle.dumps(catalogos.uso_cfdi))
+
+        self.assertEqual(catalogos.uso_cfdi.get('G01'), copia.get('G01'))
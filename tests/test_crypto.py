@@ -1,14 +1,22 @@
 import pycfdi.crypto
+import pycfdi.serialization
 import unittest
 import pathlib
 import re
+import tempfile
 import os
+from unittest import mock
 from cryptography import x509
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa
-from pycfdi import exceptions
+from cryptography.hazmat.primitives.serialization import Encoding
+from lxml import etree
+from pycfdi import cfdv33, exceptions
+from pycfdi.complementos import timbre_fiscal_digitalv11
 from tests import DATOS_PERSONA_FISICA, DATOS_PERSONA_MORAL
 
 TEST_PRIVATE_KEYS_PASSWORD = '12345678a'
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
 
 class TestCrypto(unittest.TestCase):
 
@@ -71,6 +79,268 @@ class TestCrypto(unittest.TestCase):
 
         self.assertValidSignature(key.public_key(), signed, message.encode('utf-8'))
 
+    def test_sellar_lote(self):
+        key = self._get_llave_privada_prueba('persona_fisica')
+        messages = ['foo', b'bar', 'baz']
+
+        sellos = pycfdi.crypto.sellar_lote(messages, key)
+
+        self.assertEqual([pycfdi.crypto.sellar(m, key) for m in messages], sellos)
+
+    def test_sellar_lote_con_hilos(self):
+        key = self._get_llave_privada_prueba('persona_fisica')
+        messages = [f'cadena {i}' for i in range(20)]
+
+        sellos = pycfdi.crypto.sellar_lote(iter(messages), key, max_workers=4)
+
+        for message, sello in zip(messages, sellos):
+            self.assertValidSignature(key.public_key(), sello, message.encode('utf-8'))
+
+    def test_verificar_sello(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+
+        self.assertTrue(pycfdi.crypto.verificar_sello(comprobante))
+
+    def test_verificar_sello_invalido(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        comprobante.total = '0.01'
+
+        self.assertFalse(pycfdi.crypto.verificar_sello(comprobante))
+
+    def test_verificar_sello_sin_certificado(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        comprobante.certificado = None
+
+        self.assertFalse(pycfdi.crypto.verificar_sello(comprobante))
+
+    def test_verificar_sello_no_certificado_distinto(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        sellador = self._get_sellador_prueba('persona_moral')
+        sellador.sellar_comprobante(comprobante)
+        self.assertTrue(pycfdi.crypto.verificar_sello(comprobante))
+
+        # Sello válido sobre la cadena con un NoCertificado que no es el del certificado incluido
+        comprobante.no_certificado = DATOS_PERSONA_FISICA.get('no_certificado')
+        cadena_original = pycfdi.serialization.cadena_original(comprobante)
+        comprobante.sello = pycfdi.crypto.sellar(cadena_original, self._get_llave_privada_prueba('persona_moral'))
+
+        self.assertFalse(pycfdi.crypto.verificar_sello(comprobante))
+
+    def test_verificar_sellos_de_directorio(self):
+        pycfdi.crypto.leer_certificado_base64.cache_clear()
+
+        resultados = list(pycfdi.crypto.verificar_sellos(TEST_XMLS_PATH))
+
+        self.assertEqual(len(os.listdir(TEST_XMLS_PATH)), len(resultados))
+        self.assertTrue(all(valido for comprobante, valido in resultados))
+        self.assertEqual(1, pycfdi.crypto.leer_certificado_base64.cache_info().misses)
+
+    def test_sellador_sellar_comprobante(self):
+        sellador = self._get_sellador_prueba('persona_moral')
+
+        for filename in ('CFDI.xml', 'Com_Ext.xml'):
+            with self.subTest(xml=filename):
+                comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, filename))
+
+                with mock.patch.object(
+                        pycfdi.serialization, 'serialize', wraps=pycfdi.serialization.serialize) as serialize, \
+                        mock.patch.object(
+                            pycfdi.serialization, 'serialize_tree', wraps=pycfdi.serialization.serialize_tree) as tree:
+                    xml = sellador.sellar_comprobante(comprobante)
+
+                self.assertEqual(1, serialize.call_count + tree.call_count)
+                sellado = pycfdi.serialization.deserialize(xml)
+                self.assertEqual(DATOS_PERSONA_MORAL.get('no_certificado'), sellado.no_certificado)
+                self.assertEqual(comprobante.sello, sellado.sello)
+                self.assertTrue(pycfdi.crypto.verificar_sello(sellado))
+
+    def test_sellador_certificado_y_llave_no_son_pareja(self):
+        cer_bytes = self._get_certificado_prueba('persona_moral').public_bytes(Encoding.DER)
+        key_path = os.path.join(os.path.dirname(__file__), 'certificados_prueba', 'persona_fisica', 'llave_privada.key')
+
+        with self.assertRaises(ValueError):
+            pycfdi.crypto.Sellador(cer_bytes, pathlib.Path(key_path).read_bytes(), TEST_PRIVATE_KEYS_PASSWORD)
+
+    def test_credential_cache(self):
+        cache = pycfdi.crypto.CredentialCache()
+        path = pathlib.Path(os.path.dirname(__file__), 'certificados_prueba', 'persona_moral')
+        cer_bytes = (path / 'certificado.cer').read_bytes()
+        key_bytes = (path / 'llave_privada.key').read_bytes()
+
+        key = cache.leer_llave_privada(key_bytes, TEST_PRIVATE_KEYS_PASSWORD)
+        cer = cache.leer_certificado(cer_bytes)
+
+        self.assertIs(key, cache.leer_llave_privada(key_bytes, TEST_PRIVATE_KEYS_PASSWORD))
+        self.assertIs(cer, cache.leer_certificado(cer_bytes))
+        self.assertEqual((2, 2, 0, 1024, 2), tuple(cache.info()))
+        self.assertNotIn(TEST_PRIVATE_KEYS_PASSWORD.encode(), repr(list(cache._entries)).encode())
+
+        with self.assertRaises(exceptions.crypto.IncorrectPasswordError):
+            cache.leer_llave_privada(key_bytes, 'Incorrecto')
+        self.assertEqual(2, len(cache))
+
+        self.assertEqual(1, cache.invalidar(key_bytes))
+        self.assertIsNot(key, cache.leer_llave_privada(key_bytes, TEST_PRIVATE_KEYS_PASSWORD))
+
+    def test_credential_cache_lru_y_ttl(self):
+        now = [0]
+        cache = pycfdi.crypto.CredentialCache(maxsize=1, ttl=10, timer=lambda: now[0])
+        cer_moral = self._get_certificado_prueba('persona_moral').public_bytes(Encoding.DER)
+        cer_fisica = self._get_certificado_prueba('persona_fisica').public_bytes(Encoding.DER)
+
+        cache.leer_certificado(cer_moral)
+        cache.leer_certificado(cer_fisica)
+        self.assertEqual(1, len(cache))
+        self.assertEqual(1, cache.info().evictions)
+
+        now[0] = 5
+        cache.leer_certificado(cer_fisica)
+        self.assertEqual(1, cache.info().hits)
+
+        now[0] = 10
+        cache.leer_certificado(cer_fisica)
+        self.assertEqual((1, 3, 2), cache.info()[:3])
+
+    def test_sellador_con_cache(self):
+        cache = pycfdi.crypto.CredentialCache()
+        path = pathlib.Path(os.path.dirname(__file__), 'certificados_prueba', 'persona_moral')
+        args = ((path / 'certificado.cer').read_bytes(), (path / 'llave_privada.key').read_bytes(), TEST_PRIVATE_KEYS_PASSWORD)
+
+        sellador = pycfdi.crypto.Sellador(*args, cache=cache)
+
+        self.assertIs(sellador.private_key, pycfdi.crypto.Sellador(*args, cache=cache).private_key)
+        self.assertEqual(2, cache.info().hits)
+
+    def test_xmldsig_signer_reutilizable(self):
+        cer = self._get_certificado_prueba('persona_moral')
+        key = self._get_llave_privada_prueba('persona_moral')
+        cancelacion = self._get_cancelacion_prueba()
+        signer = pycfdi.crypto.XMLDSigSigner(cer, key)
+
+        for _ in range(2):
+            root = etree.fromstring(pycfdi.serialization.serialize(cancelacion).encode())
+            signed = signer.sign(root)
+
+            self.assertEqual(1, len(root))
+            self.assertEqual(
+                pycfdi.crypto.xmldsig(cancelacion, cer, key),
+                etree.tostring(signed, xml_declaration=True, encoding='utf-8')
+            )
+
+    def test_xmldsig_signer_in_place(self):
+        cer = self._get_certificado_prueba('persona_moral')
+        key = self._get_llave_privada_prueba('persona_moral')
+        root = etree.fromstring(pycfdi.serialization.serialize(self._get_cancelacion_prueba()).encode())
+
+        signed = pycfdi.crypto.XMLDSigSigner(cer, key).sign(root, in_place=True)
+
+        self.assertIs(root, signed)
+        signature = root.find('Signature')
+        signed_info = signature.find('SignedInfo')
+        signature_value = signature.find('SignatureValue').text
+        self.assertTrue(pycfdi.crypto.verificar(
+            etree.tostring(signed_info, method='c14n'), signature_value, cer.public_key(), hashes.SHA1()
+        ))
+
+    def test_xmldsig_typed_entry_points(self):
+        cer = self._get_certificado_prueba('persona_moral')
+        key = self._get_llave_privada_prueba('persona_moral')
+        cancelacion = self._get_cancelacion_prueba()
+        xml = pycfdi.serialization.serialize(cancelacion).encode()
+        expected = pycfdi.crypto.xmldsig(cancelacion, cer, key)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            path = os.path.join(directorio, 'cancelacion.xml')
+            with open(path, 'wb') as f:
+                f.write(xml)
+
+            self.assertEqual(expected, pycfdi.crypto.xmldsig_from_path(path, cer, key))
+            self.assertEqual(expected, pycfdi.crypto.xmldsig(path, cer, key))
+
+        root = etree.fromstring(xml)
+        self.assertEqual(expected, pycfdi.crypto.xmldsig_from_bytes(xml, cer, key))
+        self.assertEqual(expected, pycfdi.crypto.xmldsig_from_element(root, cer, key))
+        self.assertIsNone(root.find('Signature'))
+
+        signed = pycfdi.crypto.xmldsig(xml, cer, key, as_element=True)
+        self.assertIsInstance(signed, etree._Element)
+        self.assertEqual(expected, etree.tostring(signed, xml_declaration=True, encoding='utf-8'))
+
+    def test_xmldsig_does_not_stat_xml_content(self):
+        cer = self._get_certificado_prueba('persona_moral')
+        key = self._get_llave_privada_prueba('persona_moral')
+        xml = pycfdi.serialization.serialize(self._get_cancelacion_prueba())
+
+        with mock.patch('os.path.isfile') as isfile:
+            pycfdi.crypto.xmldsig(xml, cer, key)
+
+        isfile.assert_not_called()
+
+    def test_firmar_cancelaciones(self):
+        cer = self._get_certificado_prueba('persona_moral')
+        key = self._get_llave_privada_prueba('persona_moral')
+        uuids = [f'5CB8D806-7BDF-4D24-AC4C-{i:012d}' for i in range(25)]
+        folios = cfdv33.Cancelacion.Folios
+
+        for max_workers in (None, 2):
+            with self.subTest(max_workers=max_workers):
+                solicitudes = list(pycfdi.crypto.firmar_cancelaciones(
+                    iter(uuids), DATOS_PERSONA_MORAL.get('rfc'), cer, key,
+                    fecha='2021-01-01T00:00:00', folios_por_solicitud=10, max_workers=max_workers
+                ))
+
+                self.assertEqual(3, len(solicitudes))
+                for i, solicitud in enumerate(solicitudes):
+                    cancelacion = cfdv33.Cancelacion(
+                        rfc_emisor=DATOS_PERSONA_MORAL.get('rfc'),
+                        fecha='2021-01-01T00:00:00',
+                        folios=[folios(uuid=folios.UUID(uuid)) for uuid in uuids[i * 10:(i + 1) * 10]]
+                    )
+                    self.assertEqual(pycfdi.crypto.xmldsig(cancelacion, cer, key), solicitud)
+
+    def test_certificate_store_from_directory(self):
+        store = pycfdi.crypto.CertificateStore.from_directory(
+            os.path.join(os.path.dirname(__file__), 'certificados_prueba')
+        )
+
+        self.assertEqual(2, len(store))
+        self.assertIn(DATOS_PERSONA_MORAL.get('no_certificado'), store)
+        self.assertEqual(
+            DATOS_PERSONA_FISICA.get('no_certificado'),
+            pycfdi.crypto.no_certificado(store.get(DATOS_PERSONA_FISICA.get('no_certificado')))
+        )
+
+    def test_certificate_store_pickle(self):
+        import pickle
+        store = pycfdi.crypto.CertificateStore.from_directory(
+            os.path.join(os.path.dirname(__file__), 'certificados_prueba')
+        )
+
+        copia = pickle.loads(pickle.dumps(store))
+
+        self.assertEqual(
+            store.get(DATOS_PERSONA_MORAL.get('no_certificado')),
+            copia.get(DATOS_PERSONA_MORAL.get('no_certificado'))
+        )
+
+    def test_verificar_sello_sat(self):
+        comprobante, store = self._get_comprobante_timbrado_prueba()
+
+        self.assertTrue(pycfdi.crypto.verificar_sello_sat(comprobante, store))
+
+    def test_verificar_sello_sat_invalido(self):
+        comprobante, store = self._get_comprobante_timbrado_prueba()
+        tfd = comprobante.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+        tfd.uuid = '00000000-0000-0000-0000-000000000000'
+
+        self.assertFalse(pycfdi.crypto.verificar_sello_sat(tfd, store))
+
+    def test_verificar_sello_sat_sin_certificado_en_almacen(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+
+        with self.assertRaises(exceptions.crypto.CertificateNotFoundError):
+            pycfdi.crypto.verificar_sello_sat(comprobante, pycfdi.crypto.CertificateStore())
+
     def test_is_pareja_valid_for_valid_pareja(self):
         key = self._get_llave_privada_prueba('persona_fisica')
         cer = self._get_certificado_prueba('persona_fisica')
@@ -125,6 +395,36 @@ class TestCrypto(unittest.TestCase):
 
         self.assertTrue(True)
 
+    def _get_comprobante_timbrado_prueba(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        tfd = comprobante.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+        key = self._get_llave_privada_prueba('persona_moral')
+
+        store = pycfdi.crypto.CertificateStore()
+        tfd.no_certificado_sat = store.add(self._get_certificado_prueba('persona_moral').public_bytes(Encoding.DER))
+        tfd.sello_sat = pycfdi.crypto.sellar(pycfdi.serialization.cadena_original(tfd), key)
+
+        return comprobante, store
+
+    @staticmethod
+    def _get_cancelacion_prueba() -> cfdv33.Cancelacion:
+        folios = cfdv33.Cancelacion.Folios
+        return cfdv33.Cancelacion(
+            rfc_emisor=DATOS_PERSONA_MORAL.get('rfc'),
+            fecha='2021-01-01T00:00:00',
+            folios=[folios(uuid=folios.UUID('5CB8D806-7BDF-4D24-AC4C-4C469EB4F57A'))]
+        )
+
+    @staticmethod
+    def _get_sellador_prueba(tipo_persona: str) -> pycfdi.crypto.Sellador:
+        path = pathlib.Path(os.path.dirname(__file__), 'certificados_prueba', tipo_persona)
+
+        return pycfdi.crypto.Sellador(
+            (path / 'certificado.cer').read_bytes(),
+            (path / 'llave_privada.key').read_bytes(),
+            TEST_PRIVATE_KEYS_PASSWORD
+        )
+
     @staticmethod
     def _get_certificado_prueba(tipo_persona: str) -> x509.Certificate:
         path_str = os.path.join(os.path.dirname(__file__), 'certificados_prueba', tipo_persona, 'certificado.cer')
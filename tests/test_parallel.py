@@ -0,0 +1,87 @@
+from pathlib import Path
+from pycfdi import crypto, parallel, serialization
+import glob
+import os
+import unittest
+from tests import DATOS_PERSONA_MORAL
+
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
+TEST_CERTS_PATH = os.path.join(os.path.dirname(__file__), 'certificados_prueba')
+TEST_KEY_PATH = os.path.join(TEST_CERTS_PATH, 'persona_moral', 'llave_privada.key')
+TEST_PRIVATE_KEYS_PASSWORD = '12345678a'
+
+
+class TestParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.key_bytes = Path(TEST_KEY_PATH).read_bytes()
+        cls.certificate_store = crypto.CertificateStore.from_directory(TEST_CERTS_PATH)
+        cls.pool = parallel.Pool(
+            max_workers=2,
+            chunksize=2,
+            key_bytes=cls.key_bytes,
+            password=TEST_PRIVATE_KEYS_PASSWORD,
+            certificate_store=cls.certificate_store
+        )
+        cls.xmls = [Path(path).read_bytes() for path in sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml')))] * 3
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_deserialize_keeps_input_order(self):
+        comprobantes = list(self.pool.deserialize(self.xmls))
+
+        self.assertEqual([serialization.deserialize(xml) for xml in self.xmls], comprobantes)
+
+    def test_cadena_original_keeps_input_order(self):
+        comprobantes = [serialization.deserialize(xml) for xml in self.xmls]
+
+        self.assertEqual(
+            [serialization.cadena_original(comprobante) for comprobante in comprobantes],
+            list(self.pool.cadena_original(comprobantes))
+        )
+
+    def test_cadena_original_de_bytes_y_rutas(self):
+        paths = sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml')))
+        resources = [Path(path).read_bytes() for path in paths] + paths + [Path(path) for path in paths]
+
+        self.assertEqual(
+            [serialization.cadena_original(serialization.deserialize(resource)) for resource in resources],
+            list(self.pool.cadena_original(resources))
+        )
+
+    def test_sellar(self):
+        key = crypto.leer_llave_privada(self.key_bytes, TEST_PRIVATE_KEYS_PASSWORD)
+        messages = [f'||3.3|{i}||' for i in range(10)]
+
+        self.assertEqual([crypto.sellar(m, key) for m in messages], list(self.pool.sellar(messages)))
+
+    def test_procesar(self):
+        for xml, (comprobante, cadena, sello) in zip(self.xmls, self.pool.procesar(self.xmls)):
+            self.assertEqual(serialization.deserialize(xml), comprobante)
+            self.assertEqual(serialization.cadena_original(comprobante), cadena)
+            self.assertIsNotNone(sello)
+
+    def test_verificar_sello(self):
+        resultados = list(self.pool.verificar_sello(self.xmls))
+
+        self.assertEqual(len(self.xmls), len(resultados))
+        self.assertTrue(all(valido for comprobante, valido in resultados))
+
+    def test_verificar_sello_sat(self):
+        from pycfdi.complementos import timbre_fiscal_digitalv11
+        key = crypto.leer_llave_privada(self.key_bytes, TEST_PRIVATE_KEYS_PASSWORD)
+        comprobantes = []
+        for xml in self.xmls:
+            comprobante = serialization.deserialize(xml)
+            tfd = comprobante.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+            if tfd:
+                tfd.no_certificado_sat = DATOS_PERSONA_MORAL.get('no_certificado')
+                tfd.sello_sat = crypto.sellar(serialization.cadena_original(tfd), key)
+                comprobantes.append(comprobante)
+
+        resultados = list(self.pool.verificar_sello_sat(comprobantes))
+
+        self.assertEqual(len(comprobantes), len(resultados))
+        self.assertTrue(all(valido for comprobante, valido in resultados))
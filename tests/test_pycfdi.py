@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import unittest
+import pycfdi
+
+RAIZ = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+class TestPycfdi(unittest.TestCase):
+    def test_importa_subpaquetes_al_usarlos(self):
+        codigo = (
+            'import sys, pycfdi; '
+            'print(sorted(m for m in sys.modules if m.split(".")[0] in ("pycfdi", "xsdata", "cryptography")))'
+        )
+        resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, stdout=subprocess.PIPE, check=True)
+
+        self.assertEqual("['pycfdi', 'pycfdi._version']", resultado.stdout.decode().strip())
+
+    def test_validation_no_importa_xsdata_ni_cryptography(self):
+        codigo = (
+            'import sys, pycfdi; '
+            'assert pycfdi.validation.is_valid_rfc("EKU9003173C9"); '
+            'print([m for m in sys.modules if m.split(".")[0] in ("xsdata", "cryptography")])'
+        )
+        resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, stdout=subprocess.PIPE, check=True)
+
+        self.assertEqual('[]', resultado.stdout.decode().strip())
+
+    def test_validation_importa_esquemas_y_reglas_al_usarlos(self):
+        codigo = (
+            'import sys, pycfdi.validation; '
+            'print([m for m in ("lxml", "pycfdi.cfdv33", "pycfdi.catalogos", "pycfdi.totales") if m in sys.modules])'
+        )
+        resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, stdout=subprocess.PIPE, check=True)
+
+        self.assertEqual('[]', resultado.stdout.decode().strip())
+        self.assertIn('validar_reglas', dir(pycfdi.validation))
+
+    def test_getattr(self):
+        self.assertIn('serialization', dir(pycfdi))
+        serialization = pycfdi.serialization
+        self.assertIs(sys.modules['pycfdi.serialization'], serialization)
+
+        with self.assertRaises(AttributeError):
+            pycfdi.no_existe
+
+    def test_getattr_assets_y_exceptions(self):
+        codigo = (
+            'import pycfdi; '
+            'print(pycfdi.assets.get_path.__module__, pycfdi.exceptions.catalogos.CatalogNotFoundError.__name__)'
+        )
+        resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, stdout=subprocess.PIPE, check=True)
+
+        self.assertEqual('pycfdi.assets.registry CatalogNotFoundError', resultado.stdout.decode().strip())
+        self.assertIn('assets', dir(pycfdi))
+        self.assertIn('exceptions', dir(pycfdi))
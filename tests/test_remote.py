@@ -0,0 +1,139 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pycfdi.assets
+from pycfdi import cfdv33, exceptions, remote, serialization
+import tempfile
+import threading
+import unittest
+import urllib.error
+from unittest import mock
+
+XSLT_PRINCIPAL = b'''<?xml version="1.0" encoding="UTF-8"?>
+<xsl:stylesheet version="2.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+    xmlns:cfdi="http://www.sat.gob.mx/cfd/3">
+  <xsl:output method="text"/>
+  <xsl:include href="utilerias.xslt"/>
+  <xsl:template match="/">|<xsl:call-template name="version"/>||</xsl:template>
+</xsl:stylesheet>
+'''
+XSLT_UTILERIAS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<xsl:stylesheet version="2.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+    xmlns:cfdi="http://www.sat.gob.mx/cfd/3">
+  <xsl:template name="version">|<xsl:value-of select="/cfdi:Comprobante/@Version"/></xsl:template>
+</xsl:stylesheet>
+'''
+ARCHIVOS = {'/xslt/principal.xslt': XSLT_PRINCIPAL, '/xslt/utilerias.xslt': XSLT_UTILERIAS}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.solicitudes.append((self.path, self.headers.get('If-None-Match')))
+        contenido = ARCHIVOS.get(self.path)
+        if contenido is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{len(contenido)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRemote(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), _Handler)
+        cls.server.solicitudes = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/xslt/principal.xslt'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.server.solicitudes.clear()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_fetch_usa_cache_en_disco(self):
+        cache = remote.RemoteCache(self.directorio.name)
+
+        self.assertEqual(XSLT_PRINCIPAL, cache.fetch(self.url))
+        self.assertEqual(XSLT_PRINCIPAL, cache.fetch(self.url))
+        self.assertEqual(1, len(self.server.solicitudes))
+
+        offline = remote.RemoteCache(self.directorio.name, offline=True)
+        self.assertEqual(XSLT_PRINCIPAL, offline.fetch(self.url))
+        self.assertEqual(1, len(self.server.solicitudes))
+
+    def test_revalida_con_etag(self):
+        cache = remote.RemoteCache(self.directorio.name, max_age=0)
+        cache.fetch(self.url)
+
+        self.assertEqual(XSLT_PRINCIPAL, cache.fetch(self.url))
+        self.assertEqual([('/xslt/principal.xslt', None), ('/xslt/principal.xslt', '"%d"' % len(XSLT_PRINCIPAL))],
+                         self.server.solicitudes)
+
+    def test_offline_sin_cache(self):
+        cache = remote.RemoteCache(self.directorio.name, offline=True)
+
+        with self.assertRaises(exceptions.remote.RemoteResourceUnavailableError):
+            cache.fetch(self.url)
+        self.assertEqual([], self.server.solicitudes)
+
+    def test_usa_copia_caducada_sin_conexion(self):
+        cache = remote.RemoteCache(self.directorio.name, max_age=0)
+        cache.fetch(self.url)
+
+        with mock.patch('urllib.request.urlopen', side_effect=urllib.error.URLError('sin conexión')):
+            self.assertEqual(XSLT_PRINCIPAL, cache.fetch(self.url))
+            with self.assertRaises(exceptions.remote.RemoteResourceUnavailableError):
+                cache.fetch(self.url.replace('principal', 'otro'))
+
+    def test_cadena_original_resuelve_includes_con_cache(self):
+        remote.set_default_cache(remote.RemoteCache(self.directorio.name))
+        try:
+            cadena = serialization.cadena_original(cfdv33.Comprobante(), self.url)
+            serialization.invalidate_xslt(self.url)
+        finally:
+            remote.set_default_cache(None)
+
+        self.assertEqual('||3.3||', cadena)
+        self.assertEqual(['/xslt/principal.xslt', '/xslt/utilerias.xslt'], [p for p, _ in self.server.solicitudes])
+
+    def test_urls_del_sat_usan_assets_incluidos(self):
+        url = 'http://www.sat.gob.mx/sitio_internet/cfd/TimbreFiscalDigital/cadenaoriginal_TFD_1_1.xslt'
+        cache = remote.RemoteCache(self.directorio.name, offline=True)
+
+        self.assertEqual(('pycfdi.assets.stylesheets', 'cadenaoriginal_TFD_1_1.xslt'), remote.get_asset(url))
+        self.assertEqual(
+            pycfdi.assets.get_bytes('pycfdi.assets.stylesheets', 'cadenaoriginal_TFD_1_1.xslt'), cache.fetch(url)
+        )
+        self.assertIsNone(remote.get_asset(self.url))
+
+    def test_urls_del_sat_distintas_a_los_assets_usan_cache(self):
+        cache = remote.RemoteCache(self.directorio.name, offline=True)
+
+        for url in (
+                'http://www.sat.gob.mx/sitio_internet/cfd/3/cadenaoriginal_3_3/cadenaoriginal_3_3.xslt',
+                'http://www.sat.gob.mx/sitio_internet/cfd/4/cadenaoriginal_4_0/utilerias.xslt',
+                'http://www.sat.gob.mx/sitio_internet/cfd/catalogos/catCFDI.xsd',
+                'http://www.sat.gob.mx/sitio_internet/cfd/3/cfdv33.xsd'):
+            with self.subTest(url=url):
+                self.assertIsNone(remote.get_asset(url))
+                with self.assertRaises(exceptions.remote.RemoteResourceUnavailableError):
+                    cache.fetch(url)
@@ -58,6 +58,31 @@ class TestSerialization(xmlunittest.XmlTestCase):
 
         self.assertIsInstance(comprobante, cfdv33.Comprobante)
 
+    def test_deserialize_xml_string_without_stat(self):
+        from pathlib import Path
+        from unittest import mock
+        xml = Path(self._get_test_xml_path('CFDI.xml')).read_text(encoding='utf-8')
+
+        with mock.patch('os.path.isfile') as isfile:
+            comprobante = serialization.deserialize(xml)
+            serialization.deserialize(xml.encode('utf-8'))
+
+        isfile.assert_not_called()
+        self.assertEqual(serialization.deserialize_string(xml), comprobante)
+
+    def test_deserialize_typed_entry_points(self):
+        from pathlib import Path
+        path_str = self._get_test_xml_path('pago.xml')
+        comprobante = serialization.deserialize(path_str)
+
+        self.assertEqual(comprobante, serialization.deserialize_path(path_str))
+        self.assertEqual(comprobante, serialization.deserialize_bytes(Path(path_str).read_bytes()))
+
+    def test_is_xml_content(self):
+        self.assertTrue(serialization.is_xml_content(b'\xef\xbb\xbf\n<?xml version="1.0"?><a/>'))
+        self.assertTrue(serialization.is_xml_content('\ufeff <a/>'))
+        self.assertFalse(serialization.is_xml_content(self._get_test_xml_path('CFDI.xml')))
+
     def test_generates_cadena_original_from_xslt_url(self):
         xslt_url = 'http://www.sat.gob.mx/sitio_internet/cfd/3/cadenaoriginal_3_3/cadenaoriginal_3_3.xslt'
         cadena_original = serialization.cadena_original(cfdv33.Comprobante(), xslt_url)
@@ -76,6 +101,20 @@ class TestSerialization(xmlunittest.XmlTestCase):
         self.assertIsInstance(tfd, timbre_fiscal_digitalv11.TimbreFiscalDigital)
         self.assertIsInstance(pagos, pagos10.Pagos)
 
+    def test_unmarshalls_nomina_without_serialization_round_trip(self):
+        from unittest import mock
+        from pycfdi.complementos import nomina12, timbre_fiscal_digitalv11
+
+        path_str = self._get_test_xml_path('nomina.xml')
+        with mock.patch.object(serialization.Codec, 'serialize') as serialize:
+            comprobante = serialization.deserialize(path_str)
+
+        serialize.assert_not_called()
+        self.assertEqual(
+            [nomina12.Nomina, timbre_fiscal_digitalv11.TimbreFiscalDigital],
+            [type(c) for c in comprobante.complemento.any_element]
+        )
+
     def test_generates_cadena_original_for_tfd(self):
         from pycfdi.complementos import timbre_fiscal_digitalv11
 
@@ -87,6 +126,184 @@ class TestSerialization(xmlunittest.XmlTestCase):
 
         self.assertIsNotNone(cadena_original)
 
+    def test_reuses_compiled_xslt_transform(self):
+        serialization.clear_xslt_cache()
+        stylesheet = cfdv33.Comprobante.Meta.stylesheet
+
+        transform = serialization.get_xslt_transform(stylesheet)
+
+        self.assertIs(transform, serialization.get_xslt_transform(stylesheet))
+        self.assertIs(transform, serialization.get_xslt_transform(stylesheet()))
+
+    def test_invalidates_compiled_xslt_transform(self):
+        stylesheet = cfdv33.Comprobante.Meta.stylesheet
+        transform = serialization.get_xslt_transform(stylesheet)
+
+        self.assertTrue(serialization.invalidate_xslt(stylesheet))
+        self.assertFalse(serialization.invalidate_xslt(stylesheet))
+        self.assertIsNot(transform, serialization.get_xslt_transform(stylesheet))
+
+    def test_xslt_cache_is_bounded(self):
+        cache = serialization.XsltCache(maxsize=2)
+        for key in ('a', 'b', 'c'):
+            cache.put((key,), object())
+
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(('a',), cache)
+
+    def test_codec_reuses_context_and_serializer(self):
+        codec = serialization.Codec()
+        comprobante = codec.deserialize(self._get_test_xml_path('nomina.xml'))
+
+        self.assertIn(cfdv33.Comprobante.Conceptos.Concepto, codec.context.cache)
+        self.assertIs(codec.parser, codec.parser)
+        self.assertEqual(serialization.serialize(comprobante), codec.serialize(comprobante))
+        self.assertIs(codec.serializer(cfdv33.Comprobante.Meta.schema_location), codec.serializer(cfdv33.Comprobante.Meta.schema_location))
+
+    def test_codec_deserializes_from_multiple_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from pathlib import Path
+
+        codec = serialization.Codec()
+        xmls = [Path(self._get_test_xml_path(filename)).read_bytes() for filename in ('CFDI.xml', 'pago.xml', 'nomina.xml')]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            comprobantes = list(executor.map(codec.deserialize, xmls * 10))
+
+        for comprobante, xml in zip(comprobantes, xmls * 10):
+            self.assertEqual(codec.deserialize(xml), comprobante)
+
+    def test_iter_deserialize_from_zip(self):
+        import io
+        import zipfile
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for filename in ('CFDI.xml', 'pago.xml', 'nomina.xml'):
+                archive.write(self._get_test_xml_path(filename), filename)
+            archive.writestr('LEEME.txt', 'no es un CFDI')
+
+        comprobantes = list(serialization.iter_deserialize(io.BytesIO(buffer.getvalue())))
+
+        self.assertEqual(3, len(comprobantes))
+        self.assertEqual(serialization.deserialize(self._get_test_xml_path('pago.xml')), comprobantes[1])
+
+    def test_iter_deserialize_from_directory(self):
+        comprobantes = list(serialization.iter_deserialize(TEST_XMLS_PATH))
+
+        self.assertEqual(len(os.listdir(TEST_XMLS_PATH)), len(comprobantes))
+        for comprobante in comprobantes:
+            self.assertIsInstance(comprobante, cfdv33.Comprobante)
+
+    def test_iter_deserialize_from_concatenated_xmls(self):
+        from pathlib import Path
+
+        xmls = [Path(self._get_test_xml_path(filename)).read_bytes() for filename in ('CFDI.xml', 'nomina.xml')]
+        dump = b'\n'.join(xmls)
+
+        from_dump = list(serialization.iter_deserialize(dump))
+        from_buffers = list(serialization.iter_deserialize(iter(xmls)))
+
+        self.assertEqual([serialization.deserialize(xml) for xml in xmls], from_dump)
+        self.assertEqual(from_dump, from_buffers)
+
+    def test_split_documents_across_chunks(self):
+        import io
+
+        dump = b'<?xml version="1.0"?><a/>\n\xef\xbb\xbf<?xml version="1.0"?><b/>'
+        documents = list(serialization._split_documents(io.BytesIO(dump), chunk_size=3))
+
+        self.assertEqual([b'<?xml version="1.0"?><a/>', b'<?xml version="1.0"?><b/>'], documents)
+
+    def test_split_documents_many_per_chunk(self):
+        import io
+
+        documents = [f'<?xml version="1.0"?><a n="{i}"/>'.encode() for i in range(1000)]
+        dump = b'\n'.join(documents)
+
+        for chunk_size in (7, 64, len(dump)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(documents, list(serialization._split_documents(io.BytesIO(dump), chunk_size=chunk_size)))
+
+    def test_iter_deserialize_with_stylesheet_processing_instruction(self):
+        import io
+        import zipfile
+        from pathlib import Path
+
+        xml = Path(self._get_test_xml_path('CFDI.xml')).read_bytes()
+        declaracion, resto = xml.split(b'?>', 1)
+        xml = declaracion + b'?>\n<?xml-stylesheet type="text/xsl" href="cfdi.xslt"?>' + resto
+        expected = serialization.deserialize(self._get_test_xml_path('CFDI.xml'))
+
+        self.assertEqual([expected, expected], list(serialization.iter_deserialize(xml + b'\n' + xml)))
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('CFDI.xml', xml)
+
+        self.assertEqual([expected], list(serialization.iter_deserialize(io.BytesIO(buffer.getvalue()))))
+
+    def test_split_documents_without_declaration_are_joined(self):
+        import io
+
+        dump = b'<a/>\n<?xml version="1.0"?><b/><c/>'
+
+        self.assertEqual(
+            [b'<a/>', b'<?xml version="1.0"?><b/><c/>'], list(serialization._split_documents(io.BytesIO(dump)))
+        )
+
+    def test_cadena_original_con_hoja_de_estilos_reducida(self):
+        from pathlib import Path
+        xslt = cfdv33.Comprobante.Meta.stylesheet
+
+        for filename in sorted(os.listdir(TEST_XMLS_PATH)):
+            with self.subTest(xml=filename):
+                xml = Path(self._get_test_xml_path(filename)).read_bytes()
+
+                self.assertEqual(
+                    serialization.cadena_original(xml, xslt),
+                    serialization.cadena_original(xml, xslt, prune=True)
+                )
+
+    def test_get_namespaces(self):
+        from lxml import etree
+        path_str = self._get_test_xml_path('pago.xml')
+        expected = {'http://www.sat.gob.mx/cfd/3', 'http://www.sat.gob.mx/Pagos', 'http://www.sat.gob.mx/TimbreFiscalDigital'}
+
+        self.assertEqual(expected, serialization.get_namespaces(etree.parse(path_str)))
+        self.assertEqual(expected, serialization.get_namespaces(serialization.deserialize(path_str)))
+
+    def test_reduced_stylesheet_keeps_only_present_complementos(self):
+        xslt = cfdv33.Comprobante.Meta.stylesheet()
+        tree = serialization._get_element_tree(xslt)
+        namespaces = {'http://www.sat.gob.mx/cfd/3', 'http://www.sat.gob.mx/Pagos'}
+
+        pruned = serialization._prune_stylesheet(tree, frozenset(namespaces))
+        includes = [include.get('href') for include in pruned.getroot().iter(f'{{{serialization.XSL_NAMESPACE}}}include')]
+
+        self.assertEqual(['utilerias.xslt', 'Pagos10.xslt'], includes)
+        self.assertIs(
+            serialization.get_pruned_xslt_transform(xslt, namespaces),
+            serialization.get_pruned_xslt_transform(xslt, reversed(sorted(namespaces)))
+        )
+
+    def test_serialize_tree_equals_parsed_serialization(self):
+        from lxml import etree
+        from unittest import mock
+
+        for filename in sorted(os.listdir(TEST_XMLS_PATH)):
+            with self.subTest(xml=filename):
+                comprobante = serialization.deserialize(self._get_test_xml_path(filename))
+                with mock.patch.object(serialization, 'serialize') as serialize:
+                    tree = serialization.serialize_tree(comprobante)
+
+                serialize.assert_not_called()
+                self.assertIsInstance(tree, etree._ElementTree)
+                self.assertEqual(
+                    etree.tostring(etree.fromstring(serialization.serialize(comprobante).encode()), method='c14n'),
+                    etree.tostring(tree, method='c14n')
+                )
+
     @staticmethod
     def _get_test_xml_path(filename: str) -> str:
         return os.path.join(TEST_XMLS_PATH, filename)
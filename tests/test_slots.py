@@ -0,0 +1,56 @@
+from pathlib import Path
+from pycfdi import cfdv33, serialization, validation
+from pycfdi.complementos import pagos10
+from pycfdi.slots import cfdv33 as cfdv33_slots, pagos10 as pagos10_slots
+import copy
+import glob
+import os
+import pickle
+import unittest
+
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
+
+
+class TestSlots(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.xmls = [Path(path).read_bytes() for path in sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml')))]
+
+    def test_variantes_sin_dict(self):
+        comprobante = serialization.deserialize(self.xmls[0], cfdv33_slots.Comprobante)
+
+        self.assertIsInstance(comprobante, cfdv33_slots.Comprobante)
+        self.assertFalse(hasattr(comprobante, '__dict__'))
+        self.assertFalse(hasattr(comprobante.conceptos.concepto[0], '__dict__'))
+        self.assertEqual('3.3', cfdv33_slots.Comprobante().version)
+
+    def test_serializa_y_genera_cadena_igual_que_modelo_original(self):
+        for xml in self.xmls:
+            original = serialization.deserialize(xml)
+            comprobante = serialization.deserialize(xml, cfdv33_slots.Comprobante)
+
+            self.assertIsInstance(original, cfdv33.Comprobante)
+            self.assertEqual(serialization.serialize(original), serialization.serialize(comprobante))
+            self.assertEqual(serialization.cadena_original(original), serialization.cadena_original(comprobante))
+
+    def test_enlaza_complementos_con_slots(self):
+        xml = Path(TEST_XMLS_PATH, 'pago.xml').read_bytes()
+        comprobante = serialization.deserialize(xml, cfdv33_slots.Comprobante)
+
+        self.assertIsNone(comprobante.get_complemento_by_type(pagos10.Pagos))
+        pagos = comprobante.get_complemento_by_type(pagos10_slots.Pagos)
+        self.assertFalse(hasattr(pagos.pago[0].docto_relacionado[0], '__dict__'))
+
+    def test_pickle_y_deepcopy(self):
+        comprobante = serialization.deserialize(self.xmls[0], cfdv33_slots.Comprobante)
+
+        self.assertEqual(comprobante, pickle.loads(pickle.dumps(comprobante)))
+        self.assertEqual(comprobante, copy.deepcopy(comprobante))
+
+    def test_valida_reglas_del_modelo_original(self):
+        comprobante = serialization.deserialize(Path(TEST_XMLS_PATH, 'CFDI.xml').read_bytes(), cfdv33_slots.Comprobante)
+        self.assertEqual([], validation.validar_reglas(comprobante))
+
+        comprobante.total = '999999.00'
+
+        self.assertEqual(['CFDI33118'], [error.codigo for error in validation.validar_reglas(comprobante)])
@@ -0,0 +1,105 @@
+from decimal import Decimal
+from pycfdi import cfdv33, serialization, totales, validation
+import copy
+import os
+import unittest
+
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
+
+
+class TestTotales(unittest.TestCase):
+    def test_calcular_totales_igual_a_xml_prueba(self):
+        for filename in ('Com_Ext.xml', 'Iedu.xml', 'nomina.xml', 'pago.xml'):
+            with self.subTest(xml=filename):
+                original = serialization.deserialize(os.path.join(TEST_XMLS_PATH, filename))
+                comprobante = copy.deepcopy(original)
+                comprobante.sub_total = comprobante.total = comprobante.descuento = comprobante.impuestos = None
+
+                totales.calcular_totales(comprobante)
+
+                self.assertEqual(original, comprobante)
+
+    def test_calcular_totales_agrupa_impuestos(self):
+        comprobante = serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+
+        totales.calcular_totales(comprobante)
+
+        self.assertEqual('2269400.00', comprobante.sub_total)
+        self.assertEqual('1436012.00', comprobante.total)
+        self.assertEqual('363104.00', comprobante.impuestos.total_impuestos_trasladados)
+        self.assertEqual('1196492.00', comprobante.impuestos.total_impuestos_retenidos)
+        self.assertEqual(
+            {'002': '2720.00', '003': '1193772.00'},
+            {r.impuesto: r.importe for r in comprobante.impuestos.retenciones.retencion}
+        )
+        self.assertEqual([], validation.validar_reglas(comprobante))
+
+    def test_calcular_totales_redondea_a_decimales_de_moneda(self):
+        Concepto = cfdv33.Comprobante.Conceptos.Concepto
+        Traslado = Concepto.Impuestos.Traslados.Traslado
+        conceptos = [
+            Concepto(importe='10.005', impuestos=Concepto.Impuestos(traslados=Concepto.Impuestos.Traslados(traslado=[
+                Traslado(base=Decimal('10.005'), impuesto='002', tipo_factor='Tasa',
+                         tasa_ocuota=Decimal('0.160000'), importe='1.6008'),
+            ]))),
+            Concepto(importe='5', descuento='1', impuestos=Concepto.Impuestos(traslados=Concepto.Impuestos.Traslados(traslado=[
+                Traslado(base=Decimal('4'), impuesto='002', tipo_factor='Exento'),
+            ]))),
+        ]
+        comprobante = cfdv33.Comprobante(tipo_de_comprobante='I', conceptos=cfdv33.Comprobante.Conceptos(concepto=conceptos))
+
+        totales.calcular_totales(comprobante)
+
+        self.assertEqual('15.01', comprobante.sub_total)
+        self.assertEqual('1.00', comprobante.descuento)
+        self.assertEqual(1, len(comprobante.impuestos.traslados.traslado))
+        self.assertEqual('1.60', comprobante.impuestos.total_impuestos_trasladados)
+        self.assertIsNone(comprobante.impuestos.retenciones)
+        self.assertEqual('15.61', comprobante.total)
+
+    def test_calcular_totales_usa_decimales_de_moneda_del_comprobante(self):
+        comprobante = serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        comprobante.moneda = 'JPY'
+
+        totales.calcular_totales(comprobante)
+
+        self.assertEqual('2269400', comprobante.sub_total)
+        self.assertEqual('1436012', comprobante.total)
+        self.assertEqual('363104', comprobante.impuestos.total_impuestos_trasladados)
+        self.assertEqual(0, totales.get_decimales_moneda('JPY'))
+        self.assertEqual(3, totales.get_decimales_moneda('KWD'))
+        self.assertEqual(totales.DECIMALES_MXN, totales.get_decimales_moneda(None))
+
+    def test_calcular_totales_pasa_validar_reglas(self):
+        Concepto = cfdv33.Comprobante.Conceptos.Concepto
+        Traslado = Concepto.Impuestos.Traslados.Traslado
+        concepto = Concepto(
+            cantidad=Decimal('1'), valor_unitario='10.005', importe='10.005',
+            impuestos=Concepto.Impuestos(traslados=Concepto.Impuestos.Traslados(traslado=[
+                Traslado(base=Decimal('10.005'), impuesto='002', tipo_factor='Tasa',
+                         tasa_ocuota=Decimal('0.160000'), importe='1.6008'),
+            ]))
+        )
+        comprobante = cfdv33.Comprobante(
+            tipo_de_comprobante='I', moneda='MXN', conceptos=cfdv33.Comprobante.Conceptos(concepto=[concepto])
+        )
+
+        totales.calcular_totales(comprobante)
+
+        self.assertEqual('10.01', comprobante.sub_total)
+        self.assertEqual('1.60', comprobante.impuestos.total_impuestos_trasladados)
+        self.assertEqual([], validation.validar_reglas(comprobante))
+
+    def test_totales_from_conceptos(self):
+        comprobante = serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+
+        resultado = totales.Totales.from_conceptos(comprobante.conceptos.concepto * 1000)
+
+        self.assertEqual(Decimal('2269400') * 1000, resultado.importe)
+        self.assertEqual(Decimal('363104') * 1000, resultado.traslados[('002', 'Tasa', Decimal('0.16'))])
+
+    def test_a_decimal_descarta_valores_no_finitos(self):
+        self.assertEqual(Decimal('1.50'), totales.a_decimal('1.50'))
+        for valor in ('NaN', 'Infinity', '-Infinity', Decimal('NaN'), 'abc', None):
+            with self.subTest(valor=valor):
+                self.assertIsNone(totales.a_decimal(valor))
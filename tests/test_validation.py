@@ -1,7 +1,14 @@
+import glob
+import importlib.util
+import os
 import unittest
 import pycfdi
+from decimal import Decimal
+from pycfdi.complementos import pagos10, timbre_fiscal_digitalv11
 from tests import DATOS_PERSONA_FISICA, DATOS_PERSONA_MORAL
 
+TEST_XMLS_PATH = os.path.join(os.path.dirname(__file__), 'xml_prueba')
+
 
 class TestValidation(unittest.TestCase):
     def test_true_is_valid_rfc_for_valid(self):
@@ -40,3 +47,140 @@ class TestValidation(unittest.TestCase):
 
         self.assertTrue(is_valid_publico_general)
         self.assertTrue(is_valid_publico_extranjero)
+
+    def test_validar_rfcs(self):
+        rfcs = [DATOS_PERSONA_MORAL['rfc'], DATOS_PERSONA_FISICA['rfc'], 'Invalid RFC', 'XAXX010101000', 'EWE1709045U1']
+
+        self.assertEqual([True, True, False, False, False], pycfdi.validation.validar_rfcs(rfcs, usar_numpy=False))
+        self.assertEqual(
+            [True, True, False, True, False],
+            pycfdi.validation.validar_rfcs(iter(rfcs), aceptar_generico=True, usar_numpy=False)
+        )
+
+    def test_motivos_rfcs(self):
+        rfcs = [DATOS_PERSONA_MORAL['rfc'], 'Invalid RFC', 'XAXX010101000', 'EWE1709045U1', 'EWE-170904-5U0']
+
+        self.assertEqual(
+            [None, 'patron', 'generico', 'digito_verificador', 'digito_verificador'],
+            pycfdi.validation.motivos_rfcs(rfcs, usar_numpy=False)
+        )
+
+    def test_motivos_rfcs_digitos_no_ascii(self):
+        rfcs = ['EKU900317\uff13C9', 'EKU90031\u0667SC9', 'EKU9003173C9']
+
+        self.assertEqual(['patron', 'patron', None], pycfdi.validation.motivos_rfcs(rfcs, usar_numpy=False))
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'NumPy is not installed')
+    def test_motivos_rfcs_numpy_igual_a_python(self):
+        rfcs = [
+            DATOS_PERSONA_MORAL['rfc'], DATOS_PERSONA_FISICA['rfc'], 'Invalid RFC', 'XAXX010101000',
+            'EWE1709045U1', 'EWE 170904 5U0', 'ÑWE1709045U0', 'WATM640917J46', 'EKU900317\uff13C9',
+            'EKU90031\u0667SC9'
+        ]
+
+        for aceptar_generico in (False, True):
+            self.assertEqual(
+                pycfdi.validation.motivos_rfcs(rfcs, aceptar_generico, usar_numpy=False),
+                pycfdi.validation.motivos_rfcs(rfcs, aceptar_generico, usar_numpy=True)
+            )
+
+    def test_validar_esquema_xml_prueba(self):
+        for path in sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml'))):
+            with self.subTest(xml=os.path.basename(path)):
+                self.assertEqual([], pycfdi.validation.validar_esquema(path))
+
+    def test_validar_esquema_reporta_errores_de_comprobante_y_complemento(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'pago.xml'))
+        comprobante.emisor.rfc = 'Invalid RFC'
+        comprobante.get_complemento_by_type(pagos10.Pagos).pago[0].monto = 'abc'
+
+        errores = pycfdi.validation.validar_esquema(comprobante)
+
+        self.assertTrue(any('Rfc' in error for error in errores))
+        self.assertTrue(any('Monto' in error for error in errores))
+
+    def test_validar_esquema_complemento(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        tfd = comprobante.get_complemento_by_type(timbre_fiscal_digitalv11.TimbreFiscalDigital)
+
+        self.assertEqual([], pycfdi.validation.validar_esquema(tfd))
+
+        tfd.fecha_timbrado = 'ayer'
+        self.assertEqual(1, len(pycfdi.validation.validar_esquema(tfd)))
+
+    def test_validar_esquema_compila_una_vez(self):
+        pycfdi.validation.validar_esquema(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        misses = pycfdi.validation.esquemas._get_schema.cache_info().misses
+
+        pycfdi.validation.validar_esquema(os.path.join(TEST_XMLS_PATH, 'nomina.xml'))
+
+        self.assertEqual(misses, pycfdi.validation.esquemas._get_schema.cache_info().misses)
+
+    def test_validar_esquema_namespace_sin_esquema(self):
+        with self.assertRaises(ValueError):
+            pycfdi.validation.validar_esquema(b'<foo xmlns="urn:foo"/>')
+
+    def test_validar_reglas_xml_prueba(self):
+        for path in sorted(glob.glob(os.path.join(TEST_XMLS_PATH, '*.xml'))):
+            with self.subTest(xml=os.path.basename(path)):
+                comprobante = pycfdi.serialization.deserialize(path)
+
+                self.assertEqual([], pycfdi.validation.validar_reglas(comprobante))
+
+    def test_validar_reglas_reporta_todos_los_errores(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        concepto = comprobante.conceptos.concepto[0]
+        concepto.importe = '1.00'
+        concepto.impuestos.traslados.traslado[0].importe = '0.01'
+        comprobante.moneda = 'USD'
+        comprobante.tipo_cambio = None
+        comprobante.total = '0.00'
+
+        errores = pycfdi.validation.validar_reglas(comprobante)
+
+        self.assertEqual(
+            ['CFDI33149', 'CFDI33161', 'CFDI33107', 'CFDI33114', 'CFDI33118', 'CFDI33195'],
+            [error.codigo for error in errores]
+        )
+        self.assertEqual('Conceptos.Concepto[0].Importe', errores[0].ruta)
+
+    def test_validar_reglas_tipo_cambio(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'pago.xml'))
+        comprobante.tipo_cambio = '1'
+
+        self.assertEqual(['CFDI33115'], [e.codigo for e in pycfdi.validation.validar_reglas(comprobante)])
+
+        comprobante.moneda = 'MXN'
+        comprobante.tipo_cambio = '2'
+        self.assertEqual(['CFDI33113'], [e.codigo for e in pycfdi.validation.validar_reglas(comprobante)])
+
+    def test_validar_reglas_importes_no_numericos(self):
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'CFDI.xml'))
+        concepto = comprobante.conceptos.concepto[0]
+        concepto.importe = 'NaN'
+        concepto.impuestos.traslados.traslado[0].base = Decimal('Infinity')
+
+        errores = [e for e in pycfdi.validation.validar_reglas(comprobante) if e.codigo == pycfdi.validation.CODIGO_NO_NUMERICO]
+
+        self.assertEqual(
+            ['Conceptos.Concepto[0].Importe', 'Conceptos.Concepto[0].Impuestos.Traslados.Traslado[0].Base'],
+            [error.ruta for error in errores]
+        )
+
+    def test_rule_engine_extend_con_reglas_de_complemento(self):
+        engine = pycfdi.validation.RuleEngine()
+
+        @engine.regla(pagos10.Pagos)
+        def regla_monto(pagos, contexto, ruta):
+            for pago in pagos.pago:
+                if Decimal(pago.monto) <= 0:
+                    yield pycfdi.validation.RuleError('CRP999', 'Monto', ruta)
+
+        comprobante = pycfdi.serialization.deserialize(os.path.join(TEST_XMLS_PATH, 'pago.xml'))
+        comprobante.get_complemento_by_type(pagos10.Pagos).pago[0].monto = '0.00'
+
+        self.assertEqual([], pycfdi.validation.validar_reglas(comprobante))
+        self.assertEqual(
+            ['CRP999'],
+            [e.codigo for e in pycfdi.validation.validar_reglas(comprobante, pycfdi.validation.REGLAS_CFDI33.extend(engine))]
+        )
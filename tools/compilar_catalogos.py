@@ -0,0 +1,67 @@
+"""
+Genera los catálogos incluidos en pycfdi.assets.catalogos a partir de los CSV de tools/catalogos, o
+comprueba que los archivos .cat incluidos corresponden a ellos:
+
+    python -m tools.compilar_catalogos
+    python -m tools.compilar_catalogos --verificar
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import List
+from pycfdi import catalogos
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+FUENTES_PATH = os.path.join(RAIZ, 'tools', 'catalogos')
+CATALOGOS_PATH = os.path.join(RAIZ, 'pycfdi', 'assets', 'catalogos')
+
+
+def compilar_catalogos(destino: str = CATALOGOS_PATH) -> List[str]:
+    """
+    Compila cada CSV de FUENTES_PATH en un archivo .cat con el mismo nombre
+    :param destino: Directorio de los archivos .cat
+    :return: Nombres de los catálogos compilados
+    """
+    return catalogos.compilar_directorio(FUENTES_PATH, destino)
+
+
+def verificar_catalogos() -> List[str]:
+    """
+    Compila los CSV en un directorio temporal y los compara con los archivos incluidos
+    :return: Nombres de los catálogos cuyo archivo incluido falta o es distinto
+    """
+    distintos = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre in compilar_catalogos(directorio):
+            archivo = nombre + catalogos.catalogo.EXTENSION
+            incluido = os.path.join(CATALOGOS_PATH, archivo)
+            if not os.path.isfile(incluido) or _leer(incluido) != _leer(os.path.join(directorio, archivo)):
+                distintos.append(nombre)
+
+    return distintos
+
+
+def _leer(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--verificar', action='store_true', help='Solo comprueba los archivos incluidos')
+    args = parser.parse_args()
+
+    if not args.verificar:
+        for nombre in compilar_catalogos():
+            print(nombre)
+        return
+
+    distintos = verificar_catalogos()
+    for nombre in distintos:
+        print(f'{nombre} no corresponde a su CSV')
+    sys.exit(1 if distintos else 0)
+
+
+if __name__ == '__main__':
+    main()